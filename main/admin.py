@@ -4,32 +4,87 @@ from django.contrib import admin
 from .models import (
     Game, GameImage, Patch, PatchSection,
     Champion, Trait, Item, Augment,
-    EntityChange, Feedback,
+    EntityChange, Feedback, FeedbackTally,
     LinkedGameAccount, PatchSuggestion, PatchSuggestionVote
 )
 
 @admin.register(Patch)
 class PatchAdmin(admin.ModelAdmin):
     list_display = ("game", "version", "updated_at")
+    list_select_related = ("game",)
     list_filter = ("game",)
     search_fields = ("version", "source_url")
 
 @admin.register(PatchSection)
 class PatchSectionAdmin(admin.ModelAdmin):
     list_display = ("patch", "category", "size", "h4", "order")
+    list_select_related = ("patch__game",)
     list_filter = ("category", "size", "patch__game")
     search_fields = ("h2", "h4", "text")
 
-admin.site.register(Champion)
-admin.site.register(Trait)
-admin.site.register(Item)
-admin.site.register(Augment)
-admin.site.register(EntityChange)
-admin.site.register(Feedback)
+@admin.register(Champion)
+class ChampionAdmin(admin.ModelAdmin):
+    list_display = ("name", "game", "set_key", "cost")
+    list_select_related = ("game",)
+    list_filter = ("game", "set_key")
+    search_fields = ("name", "slug")
 
-admin.site.register(LinkedGameAccount)
-admin.site.register(PatchSuggestion)
-admin.site.register(PatchSuggestionVote)
+@admin.register(Trait)
+class TraitAdmin(admin.ModelAdmin):
+    list_display = ("name", "game", "set_key")
+    list_select_related = ("game",)
+    list_filter = ("game", "set_key")
+    search_fields = ("name", "slug")
+
+@admin.register(Item)
+class ItemAdmin(admin.ModelAdmin):
+    list_display = ("name", "game", "set_key", "kind", "subgroup")
+    list_select_related = ("game",)
+    list_filter = ("game", "set_key", "kind")
+    search_fields = ("name", "slug")
+
+@admin.register(Augment)
+class AugmentAdmin(admin.ModelAdmin):
+    list_display = ("name", "game", "set_key", "tier")
+    list_select_related = ("game",)
+    list_filter = ("game", "set_key")
+    search_fields = ("name", "slug")
+
+@admin.register(EntityChange)
+class EntityChangeAdmin(admin.ModelAdmin):
+    list_display = ("patch", "entity_type", "size", "created_at")
+    list_select_related = ("patch__game",)
+    list_filter = ("entity_type", "size")
+
+@admin.register(Feedback)
+class FeedbackAdmin(admin.ModelAdmin):
+    list_display = ("patch", "entity_type", "vote", "user", "created_at")
+    list_select_related = ("patch__game", "user")
+    list_filter = ("entity_type", "vote")
+
+@admin.register(FeedbackTally)
+class FeedbackTallyAdmin(admin.ModelAdmin):
+    list_display = ("patch", "entity_type", "object_id", "vote", "count")
+    list_select_related = ("patch__game",)
+    list_filter = ("entity_type", "vote")
+
+@admin.register(LinkedGameAccount)
+class LinkedGameAccountAdmin(admin.ModelAdmin):
+    list_display = ("user", "game", "provider", "verified", "linked_at")
+    list_select_related = ("user", "game")
+    list_filter = ("provider", "verified")
+
+@admin.register(PatchSuggestion)
+class PatchSuggestionAdmin(admin.ModelAdmin):
+    list_display = ("title", "game", "author", "status", "created_at")
+    list_select_related = ("game", "author")
+    list_filter = ("status", "game")
+    search_fields = ("title",)
+
+@admin.register(PatchSuggestionVote)
+class PatchSuggestionVoteAdmin(admin.ModelAdmin):
+    list_display = ("user", "suggestion", "created_at")
+    list_select_related = ("user", "suggestion")
 
 class GameImageInline(admin.TabularInline):
     model = GameImage
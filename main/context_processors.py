@@ -1,5 +1,47 @@
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+
+from django.core.cache import cache
+
 from .models import Game
 
+NAVBAR_GAMES_CACHE_KEY = "navbar_games_v1"
+NAVBAR_GAMES_TTL = 300
+GAMES_BY_SLUG_TTL = 60
+
+
+def _load_navbar_games() -> list[Game]:
+    return list(
+        Game.objects
+        .filter(is_active=True)
+        .only("id", "name", "slug", "short_name", "icon", "sort_order")
+        .order_by("sort_order", "name")
+    )
+
+
+@lru_cache(maxsize=1)
+def _games_by_slug_cached(ttl_bucket: int) -> dict[str, SimpleNamespace]:
+    return {
+        row["slug"]: SimpleNamespace(**row)
+        for row in Game.objects.values("id", "name", "slug")
+    }
+
+
+def games_by_slug() -> dict[str, SimpleNamespace]:
+    """
+    {slug: namespace(id, name, slug)} for every game, cached in-process.
+    Lighter than Game instances and reads the same as one (game.name).
+    The bucket argument makes entries expire after GAMES_BY_SLUG_TTL seconds
+    (other processes); Game signals clear it right away in this one.
+    """
+    return _games_by_slug_cached(int(time.monotonic() // GAMES_BY_SLUG_TTL))
+
+
+def clear_games_by_slug() -> None:
+    _games_by_slug_cached.cache_clear()
+
+
 def current_game(request):
     """
     Inject current_game + active_game_slug based on URL pattern:
@@ -9,15 +51,12 @@ def current_game(request):
 
     # Expected: ["games", "<slug>", ...]
     if len(path) >= 2 and path[0] == "games":
-        slug = path[1]
-        try:
-            game = Game.objects.only("id", "name", "slug").get(slug=slug)
+        game = games_by_slug().get(path[1])
+        if game:
             return {
                 "current_game": game,
                 "active_game_slug": game.slug,
             }
-        except Game.DoesNotExist:
-            pass
 
     return {
         "current_game": None,
@@ -32,7 +71,8 @@ def navbar_games(request):
     if len(parts) >= 2 and parts[0] == "games":
         active_slug = parts[1]
 
-    games = Game.objects.filter(is_active=True).order_by("sort_order", "name")
+    # Games barely change; cached and cleared by the Game signals (main/signals.py)
+    games = cache.get_or_set(NAVBAR_GAMES_CACHE_KEY, _load_navbar_games, NAVBAR_GAMES_TTL)
 
     return {
         "navbar_games": games,
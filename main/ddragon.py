@@ -0,0 +1,212 @@
+"""
+Shared Data Dragon plumbing for the TFT seed commands (seed_tft_ddragon and
+seed_tft_catalog): downloading/caching the JSON files, and one data-driven
+upsert that both commands run their champion/trait/item/augment passes through.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+from django.utils.text import slugify
+
+try:
+    import orjson
+except ImportError:  # stdlib json works too, just slower on multi-MB files
+    orjson = None
+
+
+DD_VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+DD_DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{ver}/data/{lang}/{file}"
+DD_IMG_URL = "https://ddragon.leagueoflegends.com/cdn/{ver}/img/{group}/{full}"
+
+# Keep-alive pool big enough for the concurrent file downloads, plus retries
+# for the CDN's occasional 429/5xx.
+DD_ADAPTER_KWARGS = {
+    "pool_connections": 1,
+    "pool_maxsize": 8,
+    "max_retries": Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+}
+
+# Versioned Data Dragon files never change, so they're kept on disk per version/locale.
+DD_CACHE_DIR = Path(settings.BASE_DIR) / ".ddragon_cache"
+
+# Riot TFT endpoints + icon folders (official docs)
+DD_FILES = {
+    "champion": ("tft-champion.json", "tft-champion"),
+    "trait": ("tft-trait.json", "tft-trait"),
+    "item": ("tft-item.json", "tft-item"),
+    "augment": ("tft-augments.json", "tft-augment"),
+}
+
+SET_FROM_IMAGE_RE = re.compile(r"\.TFT_Set(\d+)\.", re.IGNORECASE)
+SET_FROM_ID_RE = re.compile(r"^TFT(\d+)_", re.IGNORECASE)
+
+
+def dd_session(user_agent: str) -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"User-Agent": user_agent})
+    session.mount("https://", HTTPAdapter(**DD_ADAPTER_KWARGS))
+    return session
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def get_json(session: requests.Session, url: str, cache_path: Optional[Path] = None) -> Any:
+    if cache_path is not None and cache_path.exists():
+        return _loads(cache_path.read_bytes())
+
+    r = session.get(url, timeout=30)
+    r.raise_for_status()
+    if cache_path is not None:
+        # write-then-rename so an interrupted run never leaves a truncated file behind
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, delete=False) as tmp:
+            tmp.write(r.content)
+        os.replace(tmp.name, cache_path)
+    return _loads(r.content)
+
+
+def latest_dd_version(session: requests.Session) -> str:
+    # versions.json is the official Data Dragon version list
+    versions = get_json(session, DD_VERSIONS_URL)
+    if not versions:
+        raise RuntimeError("versions.json returned empty list")
+    return versions[0]
+
+
+def fetch_dd_data(session: requests.Session, ddver: str, lang: str = "en_US", use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Download the four TFT data files concurrently (they don't depend on each
+    other) and return {"champion": data, "trait": data, ...}. With use_cache,
+    files already saved under DD_CACHE_DIR/<ver>/<lang>/ are read from disk.
+    """
+    def get(file: str) -> Dict[str, Any]:
+        cache_path = DD_CACHE_DIR / ddver / lang / file if use_cache else None
+        payload = get_json(session, DD_DATA_URL.format(ver=ddver, lang=lang, file=file), cache_path)
+        # tft-augments.json has extra keys at the top; the main list is always in "data"
+        return payload.get("data", {}) or {}
+
+    with ThreadPoolExecutor(max_workers=len(DD_FILES)) as pool:
+        futures = {kind: pool.submit(get, file) for kind, (file, _) in DD_FILES.items()}
+        return {kind: f.result() for kind, f in futures.items()}
+
+
+def dd_image_prefixes(ddver: str) -> Dict[str, str]:
+    # {"champion": ".../cdn/<ver>/img/tft-champion/", ...}; built once per run so
+    # each entry's image_url is a plain concatenation.
+    return {kind: DD_IMG_URL.format(ver=ddver, group=group, full="") for kind, (_, group) in DD_FILES.items()}
+
+
+@lru_cache(maxsize=4096)
+def slug_for(name: str) -> str:
+    # Names repeat across sets and files (Ahri, trait names...); slugify is not cheap.
+    return slugify(name)
+
+
+@dataclass(slots=True)
+class UpsertStats:
+    added: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+class SeedPass(NamedTuple):
+    """
+    One row of a seed command's pass table. row_fn turns a Data Dragon entry
+    into model field values, or None to skip it; key_fields pick the existing
+    row to compare against, unique_fields are the model's unique constraint.
+    """
+    kind: str
+    model: Any
+    label: str
+    row_fn: Callable[..., Optional[Dict[str, Any]]]
+    key_fields: tuple[str, ...]
+    unique_fields: tuple[str, ...]
+    update_fields: tuple[str, ...]
+
+
+def upsert_entries(
+    model,
+    game,
+    rows: Iterable[Dict[str, Any]],
+    key_fields: Sequence[str],
+    unique_fields: Sequence[str],
+    update_fields: Sequence[str],
+    dry_run: bool,
+) -> UpsertStats:
+    """
+    Diff rows against the game's existing objects and write the result in (at
+    most) one batched INSERT ... ON CONFLICT DO UPDATE plus one batched UPDATE.
+    Only truthy incoming values overwrite existing ones.
+    """
+    stats = UpsertStats()
+    # Descending pk so the oldest row wins a key shared by several rows (what .first() used to pick).
+    existing = {
+        tuple(getattr(o, f) for f in key_fields): o
+        for o in model.objects.filter(game=game).only("id", *key_fields, *update_fields).order_by("-pk")
+    }
+    # What each stored row already holds, so the common "nothing changed" rerun
+    # is one tuple compare per entry instead of a per-field diff.
+    fingerprints = {key: tuple(getattr(o, f) for f in update_fields) for key, o in existing.items()}
+    created = []
+    dirty: Dict[int, Any] = {}
+    dirty_fields: set[str] = set()
+
+    for row in rows:
+        key = tuple(row[f] for f in key_fields)
+        obj = existing.get(key)
+        if obj is None:
+            obj = existing[key] = model(game=game, **row)
+            created.append(obj)
+            stats.added += 1
+            continue
+
+        if fingerprints.get(key) == tuple(map(row.get, update_fields)):
+            stats.skipped += 1
+            continue
+
+        changed: list[str] = []
+        for field in update_fields:
+            val = row.get(field)
+            if val and getattr(obj, field) != val:
+                setattr(obj, field, val)
+                changed.append(field)
+
+        if changed:
+            fingerprints.pop(key, None)
+            if obj.pk:
+                dirty[obj.pk] = obj
+                dirty_fields.update(changed)
+            stats.updated += 1
+        else:
+            stats.skipped += 1
+
+    if not dry_run:
+        if created:
+            model.objects.bulk_create(
+                created,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=list(unique_fields),
+                update_fields=list(update_fields),
+            )
+        if dirty:
+            # only SET the columns that actually changed on at least one row
+            fields = [f for f in update_fields if f in dirty_fields]
+            model.objects.bulk_update(list(dirty.values()), fields, batch_size=500)
+
+    return stats
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import zlib
+
+from django import forms
+from django.db import models
+
+try:
+    import zstandard
+except ImportError:  # zlib (stdlib) fallback; compresses HTML less well
+    zstandard = None
+
+
+# First byte of every stored value says how the rest was compressed, so rows
+# written with either codec stay readable.
+_ZSTD = b"Z"
+_ZLIB = b"D"
+ZSTD_LEVEL = 10
+
+
+def compress_text(value: str) -> bytes:
+    data = value.encode("utf-8")
+    if zstandard is not None:
+        return _ZSTD + zstandard.compress(data, ZSTD_LEVEL)
+    return _ZLIB + zlib.compress(data, 9)
+
+
+def decompress_text(value: bytes) -> str:
+    tag, payload = value[:1], value[1:]
+    if tag == _ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed value found but the zstandard package is not installed")
+        return zstandard.decompress(payload).decode("utf-8")
+    if tag == _ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    raise ValueError(f"unknown compression tag {tag!r}")
+
+
+class CompressedTextField(models.BinaryField):
+    """
+    A text field stored compressed in a binary column. Python code sees a str;
+    the database sees zstd (or zlib) bytes. Not usable in lookups.
+    """
+
+    empty_values = list(models.Field.empty_values)
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("editable", True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.editable:
+            kwargs.pop("editable", None)
+        else:
+            kwargs["editable"] = False
+        return name, path, args, kwargs
+
+    def get_default(self):
+        default = super().get_default()
+        return "" if default == b"" else default
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        if not value:
+            return ""  # an empty blob has no tag byte to dispatch on
+        return decompress_text(bytes(value))
+
+    def to_python(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        if not value:
+            return ""
+        return decompress_text(bytes(value))
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if isinstance(value, str):
+            value = compress_text(value)
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{"form_class": forms.CharField, "widget": forms.Textarea, **kwargs})
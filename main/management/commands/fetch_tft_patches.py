@@ -1,47 +1,107 @@
 from __future__ import annotations
 
 import hashlib
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
-from ...models import Game, Patch, PatchSection
-from ...parsers.tft_patch_parser import parse_tft_patch_blocks
+from ...models import Game, Patch
+from ...parsers.tft_patch_parser import parse_tft_patch_page
+from ...patch_sync import sync_entity_changes, sync_sections
 
 
 BASE = "https://teamfighttactics.leagueoflegends.com/en-us/news/game-updates/"
 
+PATCH_SLUG_PREFIX = "teamfight-tactics-patch-"
+VERSION_RE = re.compile(r"^\d+\.\d+$")
+
+# HEAD answers that mean "no such page" (405/501 etc. still fall through to GET)
+MISSING_STATUSES = {404, 410}
 
+
+@lru_cache(maxsize=None)
 def _version_key(v: str):
     a, b = v.split(".")
     return (int(a), int(b))
 
 
-def _url_candidates(version: str) -> list[str]:
+@lru_cache(maxsize=None)
+def _url_candidates(version: str) -> tuple[str, ...]:
     """
     Riot använder minst två varianter:
       /teamfight-tactics-patch-16-4/
       /teamfight-tactics-patch-15-5-notes/
     Så vi provar båda.
     """
-    maj, minor = version.split(".")
-    maj_i = int(maj)
-    min_i = int(minor)
+    maj_i, min_i = _version_key(version)
+    stem = f"{BASE}{PATCH_SLUG_PREFIX}{maj_i}-{min_i}"
+    return (f"{stem}/", f"{stem}-notes/")
+
 
-    slugs = [
-        f"teamfight-tactics-patch-{maj_i}-{min_i}",
-        f"teamfight-tactics-patch-{maj_i}-{min_i}-notes",
-    ]
-    return [f"{BASE}{slug}/" for slug in slugs]
+def _conditional_headers(patch: Patch | None) -> dict[str, str]:
+    """
+    Validators from the last fetch, so Riot can answer 304 Not Modified.
+    """
+    headers: dict[str, str] = {}
+    if patch is None:
+        return headers
+    if patch.etag:
+        headers["If-None-Match"] = patch.etag
+    if patch.last_modified:
+        headers["If-Modified-Since"] = patch.last_modified
+    return headers
+
+
+def _fetch_version(
+    session: requests.Session,
+    version: str,
+    urls: tuple[str, ...],
+    conditional: dict[str, str],
+) -> tuple[str, str | None, requests.Response | None]:
+    """
+    Returns (version, url_used, response) for the first candidate URL that
+    looks like a real patch page (or answered 304 to our conditional GET),
+    or (version, None, None) if none did.
+
+    `conditional` headers are only sent to urls[0], which is the URL the
+    stored patch came from.
+    """
+    for i, url in enumerate(urls):
+        conditional_get = bool(conditional) and i == 0
+        if not conditional_get:
+            # most brute-force candidates don't exist; a HEAD tells us without
+            # downloading a 404 page body
+            try:
+                h = session.head(url, timeout=5, allow_redirects=True)
+            except requests.RequestException:
+                continue
+            if h.status_code in MISSING_STATUSES:
+                continue
+
+        try:
+            r = session.get(
+                url,
+                timeout=20,
+                allow_redirects=True,
+                headers=conditional if conditional_get else None,
+            )
+        except requests.RequestException:
+            continue
 
+        if r.status_code == 304:
+            return version, url, r
 
-def _extract_patch_container(html: str):
-    soup = BeautifulSoup(html, "html.parser")
-    container = soup.select_one("#patch-notes-container")
-    if not container:
-        container = soup.select_one('[data-testid="rich-text-html"]')
-    return soup, container
+        # byte length: r.text would decode (and maybe charset-sniff) the whole body
+        if r.status_code == 200 and len(r.content) > 800:
+            return version, url, r
+
+    return version, None, None
 
 
 class Command(BaseCommand):
@@ -57,6 +117,12 @@ class Command(BaseCommand):
         parser.add_argument("--major-min", type=int, default=14)
         parser.add_argument("--major-max", type=int, default=16)
         parser.add_argument("--minor-max", type=int, default=24)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="How many versions to fetch concurrently.",
+        )
 
     def handle(self, *args, **opts):
         game, _ = Game.objects.get_or_create(
@@ -72,8 +138,15 @@ class Command(BaseCommand):
             )
         }
 
+        workers = max(1, int(opts["workers"]))
+
+        # One keep-alive connection per worker, all to the same Riot host.
+        # The default pool (10) would drop connections with more workers.
         session = requests.Session()
         session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
 
         # -----------------------------
         # Decide which versions to try
@@ -82,19 +155,46 @@ class Command(BaseCommand):
         versions: list[str] = []
 
         if versions_arg:
-            versions = [v.strip() for v in versions_arg.split(",") if v.strip()]
+            requested = {v.strip() for v in versions_arg.split(",") if v.strip()}
+            for bad in sorted(v for v in requested if not VERSION_RE.match(v)):
+                self.stderr.write(f"⚠ Ignoring invalid version {bad!r} (expected e.g. 16.4)")
+
+            # remove duplicates + sort desc
+            versions = sorted(
+                (v for v in requested if VERSION_RE.match(v)),
+                key=_version_key,
+                reverse=True,
+            )
         else:
             major_min = int(opts["major_min"])
             major_max = int(opts["major_max"])
             minor_max = int(opts["minor_max"])
 
             # brute-force: try major_max.minor_max down to major_min.1
-            for maj in range(major_max, major_min - 1, -1):
-                for minor in range(minor_max, 0, -1):
-                    versions.append(f"{maj}.{minor}")
+            # (generated unique and already sorted desc)
+            versions = [
+                f"{maj}.{minor}"
+                for maj in range(major_max, major_min - 1, -1)
+                for minor in range(minor_max, 0, -1)
+            ]
+
+        known = {
+            p.version: p
+            for p in Patch.objects.filter(game=game).only(
+                "version", "source_url", "content_hash", "etag", "last_modified"
+            )
+        }
 
-        # remove duplicates + sort desc
-        versions = sorted(set(versions), key=_version_key, reverse=True)
+        candidates = []
+        for v in versions:
+            urls = _url_candidates(v)
+            patch = known.get(v)
+            if patch and patch.source_url in urls:
+                # try the URL we already know first, conditionally
+                urls = (patch.source_url,) + tuple(u for u in urls if u != patch.source_url)
+                candidates.append((v, urls, _conditional_headers(patch)))
+            else:
+                candidates.append((v, urls, {}))
 
         self.stdout.write(f"🔎 Trying {len(versions)} version(s) directly…")
 
@@ -102,104 +202,129 @@ class Command(BaseCommand):
         updated = 0
         skipped = 0
         not_found = 0
+        pending: list[Patch] = []
+        fetched: list[tuple[str, str, bytes, str, str, str | bytes, str | None]] = []
 
-        for version in versions:
-            html = None
-            url_used = None
-
-            for url in _url_candidates(version):
-                try:
-                    r = session.get(url, timeout=20, allow_redirects=True)
-                except requests.RequestException:
-                    continue
+        # Network is the bottleneck, so fetch in a thread pool. pool.map yields
+        # in input order; DB access stays on this thread.
+        pool = ThreadPoolExecutor(max_workers=workers)
+        results = pool.map(lambda vc: _fetch_version(session, *vc), candidates)
 
-                if r.status_code == 200 and r.text and len(r.text) > 800:
-                    html = r.text
-                    url_used = url
-                    break
-
-            if not html:
+        for version, url_used, r in results:
+            if r is None:
                 not_found += 1
                 continue
 
-            soup, container = _extract_patch_container(html)
+            if r.status_code == 304:
+                skipped += 1
+                self.stdout.write(f"⏭ Skipped {version} (not modified)")
+                continue
 
-            if container:
-                raw_html = str(container)
-                raw_text = container.get_text("\n", strip=True)
+            etag = r.headers.get("ETag", "")
+            last_modified = r.headers.get("Last-Modified", "")
+
+            # hash the response bytes, so unchanged pages are never parsed
+            content_hash = hashlib.sha256(r.content).digest()
+
+            known_patch = known.get(version)
+            if known_patch and known_patch.content_hash == content_hash:
+                if known_patch.etag != etag or known_patch.last_modified != last_modified:
+                    known_patch.etag = etag
+                    known_patch.last_modified = last_modified
+                    known_patch.save(update_fields=["etag", "last_modified"])
+                skipped += 1
+                self.stdout.write(f"⏭ Skipped {version}")
+                continue
+
+            # Hand the parser raw bytes when the server names the charset, so
+            # the page is decoded once in C instead of via r.text first. Without
+            # a declared charset let requests decode (lxml would guess latin-1).
+            if "charset=" in r.headers.get("Content-Type", "").lower():
+                body, encoding = r.content, r.encoding
             else:
-                # fallback
-                article = soup.find("article") or soup.find("main")
-                raw_html = str(article) if article else ""
-                raw_text = article.get_text("\n", strip=True) if article else ""
+                body, encoding = r.text, None
+
+            fetched.append((version, url_used, content_hash, etag, last_modified, body, encoding))
+
+        pool.shutdown()
+
+        # Parsing is CPU-bound, so spread it over processes. Only plain
+        # strings/dicts cross the process boundary; the ORM stays here.
+        bodies = [f[5] for f in fetched]
+        encodings = [f[6] for f in fetched]
+        if len(bodies) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(bodies), os.cpu_count() or 1)) as procs:
+                parsed = list(procs.map(parse_tft_patch_page, bodies, encodings))
+        else:
+            parsed = [parse_tft_patch_page(b, e) for b, e in zip(bodies, encodings)]
+
+        blocks_by_version = {}
+        for (version, url_used, content_hash, etag, last_modified, _, _), page in zip(fetched, parsed):
+            raw_html, raw_text, blocks = page
 
             if not raw_text or len(raw_text) < 200:
                 self.stderr.write(f"⚠ Content too short for {version} ({url_used})")
                 continue
 
-            # hash payload
-            hash_payload = (raw_text + "\n\n" + (raw_html or "")).encode("utf-8")
-            content_hash = hashlib.sha256(hash_payload).hexdigest()
-
-            patch, created = Patch.objects.get_or_create(
+            patch = Patch(
                 game=game,
                 version=version,
-                defaults={
-                    "raw_text": raw_text,
-                    "raw_html": raw_html,
-                    "content_hash": content_hash,
-                    "source_url": url_used or "",
-                    "source_slug": (url_used or "").rstrip("/").split("/")[-1],
-                },
+                raw_text=raw_text,
+                raw_html=raw_html,
+                content_hash=content_hash,
+                source_url=url_used,
+                source_slug=url_used.rstrip("/").rsplit("/", 1)[-1],
+                etag=etag,
+                last_modified=last_modified,
             )
+            patch.fill_version_parts()  # bulk_create skips save()
+            pending.append(patch)
+            blocks_by_version[version] = blocks
 
-            changed = False
-            if created:
-                added += 1
-                changed = True
-                self.stdout.write(f"✅ Added {version} ({url_used})")
-            elif patch.content_hash != content_hash:
-                patch.raw_text = raw_text
-                patch.raw_html = raw_html
-                patch.content_hash = content_hash
-                patch.source_url = url_used or ""
-                patch.source_slug = (url_used or "").rstrip("/").split("/")[-1]
-                patch.save()
+            if version in known:
                 updated += 1
-                changed = True
                 self.stdout.write(f"♻ Updated {version} ({url_used})")
             else:
-                skipped += 1
-                self.stdout.write(f"⏭ Skipped {version}")
+                added += 1
+                self.stdout.write(f"✅ Added {version} ({url_used})")
 
-            # -----------------------------
-            # Save PatchSection rows
-            # -----------------------------
-            if changed:
-                patch.sections.all().delete()
+        # -----------------------------
+        # Upsert patches + PatchSection rows in one go
+        # -----------------------------
+        with transaction.atomic():
+            # pks come back for both inserted and updated rows (Django 5+)
+            Patch.objects.bulk_create(
+                pending,
+                update_conflicts=True,
+                unique_fields=["game", "version"],
+                update_fields=[
+                    "raw_text",
+                    "raw_html",
+                    "content_hash",
+                    "source_url",
+                    "source_slug",
+                    "etag",
+                    "last_modified",
+                    "sections_stale",  # sections are rebuilt below
+                    "updated_at",
+                ],
+            )
 
-                blocks = parse_tft_patch_blocks(raw_html or "")
+            blocks_by_patch = {patch: blocks_by_version[patch.version] for patch in pending}
+            section_stats = sync_sections(blocks_by_patch)
+
+            for patch, blocks in blocks_by_patch.items():
                 if not blocks:
-                    self.stderr.write(f"⚠ No blocks parsed for {version}")
-                    continue
-
-                PatchSection.objects.bulk_create(
-                    [
-                        PatchSection(
-                            patch=patch,
-                            category=b["category"],
-                            size=b["size"],
-                            h2=b["h2"],
-                            h4=b["h4"],
-                            order=b["order"],
-                            text=b["text"],
-                            lines_json=b["lines"],
-                            unit_tier=b["unit_tier"],
-                        )
-                        for b in blocks
-                    ]
+                    self.stderr.write(f"⚠ No blocks parsed for {patch.version}")
+
+                ins, upd, rem = section_stats[patch.pk]
+                self.stdout.write(
+                    f"🧩 Sections for {patch.version}: added={ins}, updated={upd}, removed={rem}"
                 )
-                self.stdout.write(f"🧩 Saved {len(blocks)} sections for {version}")
+
+            change_counts = sync_entity_changes(game, pending)
+            for patch in pending:
+                self.stdout.write(f"🔗 Entity changes for {patch.version}: {change_counts[patch.pk]}")
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from ...models import Game, Patch
+from ...parsers.tft_patch_parser import parse_tft_patch_blocks
+from ...patch_sync import sync_entity_changes, sync_sections
+
+
+class Command(BaseCommand):
+    help = (
+        "Parse stored TFT patch HTML into PatchSection/EntityChange rows, so "
+        "patch pages never have to parse it while serving a request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--versions",
+            type=str,
+            default="",
+            help="Comma-separated versions to reparse, e.g. 16.4,16.3.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Reparse every patch (e.g. after a parser change), not just patches without (or with stale) sections.",
+        )
+
+    def handle(self, *args, **opts):
+        game = Game.objects.filter(slug="tft").first()
+        if game is None:
+            self.stderr.write("⚠ No TFT game yet; run fetch_tft_patches first")
+            return
+
+        patches = Patch.objects.filter(game=game).exclude(raw_html__isnull=True).only("id", "game_id", "version", "version_major")
+        versions = {v.strip() for v in (opts.get("versions") or "").split(",") if v.strip()}
+        if versions:
+            patches = patches.filter(version__in=versions)
+        elif not opts["all"]:
+            # never parsed, or raw_html edited since (see Patch.save)
+            patches = patches.filter(Q(sections__isnull=True) | Q(sections_stale=True)).distinct()
+        patches = list(patches)
+
+        if not patches:
+            self.stdout.write("Nothing to reparse.")
+            return
+
+        # raw_html is the biggest column; load it only for the parse
+        html_by_pk = dict(Patch.objects.filter(pk__in=[p.pk for p in patches]).values_list("pk", "raw_html"))
+        htmls = [html_by_pk[p.pk] or "" for p in patches]
+
+        # same split as fetch_tft_patches: parse in processes, ORM stays here
+        if len(htmls) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(htmls), os.cpu_count() or 1)) as procs:
+                parsed = list(procs.map(parse_tft_patch_blocks, htmls))
+        else:
+            parsed = [parse_tft_patch_blocks(h) for h in htmls]
+
+        with transaction.atomic():
+            blocks_by_patch = dict(zip(patches, parsed))
+            section_stats = sync_sections(blocks_by_patch)
+            change_counts = sync_entity_changes(game, patches)
+            Patch.objects.filter(pk__in=[p.pk for p in patches]).update(sections_stale=False)
+
+        for patch, blocks in blocks_by_patch.items():
+            if not blocks:
+                self.stderr.write(f"⚠ No blocks parsed for {patch.version}")
+            ins, upd, rem = section_stats[patch.pk]
+            self.stdout.write(
+                f"🧩 {patch.version}: sections added={ins}, updated={upd}, removed={rem}; "
+                f"entity changes={change_counts[patch.pk]}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"\n🎉 Done! Reparsed={len(patches)}"))
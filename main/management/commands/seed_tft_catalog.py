@@ -1,49 +1,25 @@
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
-import requests
 from django.core.management.base import BaseCommand
-from django.utils.text import slugify
-
+from django.db import transaction
+
+from ...ddragon import (
+    SET_FROM_ID_RE,
+    SET_FROM_IMAGE_RE,
+    SeedPass,
+    dd_image_prefixes,
+    dd_session,
+    fetch_dd_data,
+    latest_dd_version,
+    slug_for,
+    upsert_entries,
+)
 from ...models import Game, Champion, Trait, Item, Augment
 
 
-DD_VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
-DD_DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{ver}/data/{lang}/{file}"
-DD_IMG_URL = "https://ddragon.leagueoflegends.com/cdn/{ver}/img/{group}/{full}"
-
-
-# Riot TFT endpoints + icon folders (official docs)
-FILES = {
-    "champion": ("tft-champion.json", "tft-champion"),
-    "item": ("tft-item.json", "tft-item"),
-    "trait": ("tft-trait.json", "tft-trait"),
-    "augment": ("tft-augments.json", "tft-augment"),
-}
-
-
-SET_FROM_IMAGE_RE = re.compile(r"\.TFT_Set(\d+)\.", re.IGNORECASE)
-SET_FROM_ID_RE = re.compile(r"^TFT(\d+)_", re.IGNORECASE)
-TUTORIAL_ID_RE = re.compile(r"^TFTTutorial_", re.IGNORECASE)
-
-
-def _get_json(session: requests.Session, url: str) -> Dict[str, Any]:
-    r = session.get(url, timeout=30)
-    r.raise_for_status()
-    return r.json()
-
-
-def _latest_dd_version(session: requests.Session) -> str:
-    # versions.json is the official Data Dragon version list
-    versions = _get_json(session, DD_VERSIONS_URL)
-    if not versions:
-        raise RuntimeError("versions.json returned empty list")
-    return versions[0]
-
-
 def _infer_set_num(entry_id: str, image_full: str) -> Optional[int]:
     # Best signal is the image filename: e.g. TFT9_Irelia.TFT_Set9.png
     if image_full:
@@ -68,11 +44,120 @@ def _maybe_suffix_slug(base_slug: str, set_num: Optional[int], all_sets: bool) -
     return base_slug
 
 
-@dataclass
-class UpsertStats:
-    added: int = 0
-    updated: int = 0
-    skipped: int = 0
+@dataclass(slots=True)
+class SeedRun:
+    img_prefix: Dict[str, str]
+    set_filter: int
+    all_sets: bool
+    include_tutorial: bool
+
+    def skips_set(self, set_num: Optional[int]) -> bool:
+        return (not self.all_sets) and bool(self.set_filter) and bool(set_num) and set_num != self.set_filter
+
+
+# Entry -> row: model fields for one Data Dragon entry, or None to skip it.
+def _trait_row(_key: str, v: Dict[str, Any], run: SeedRun) -> Optional[Dict[str, Any]]:
+    name = v.get("name") or ""
+    if not name:
+        return None
+
+    entry_id = v.get("id") or ""
+    img_full = (v.get("image") or {}).get("full") or ""
+
+    set_num = _infer_set_num(entry_id, img_full)
+    if run.skips_set(set_num):
+        return None
+
+    return {
+        "slug": _maybe_suffix_slug(slug_for(name), set_num, run.all_sets),
+        "name": name,
+        "image_url": run.img_prefix["trait"] + img_full if img_full else "",
+    }
+
+
+def _champion_row(_key: str, v: Dict[str, Any], run: SeedRun) -> Optional[Dict[str, Any]]:
+    name = v.get("name") or ""
+    if not name:
+        return None
+
+    entry_id = v.get("id") or ""
+    tier = v.get("tier")
+    cost = v.get("cost")  # sometimes present in tutorial-ish entries
+    if (not run.include_tutorial) and (entry_id.lower().startswith("tfttutorial_") or (cost == 0 and (tier or 0) == 0)):
+        return None
+
+    img_full = (v.get("image") or {}).get("full") or ""
+
+    set_num = _infer_set_num(entry_id, img_full)
+    if run.skips_set(set_num):
+        return None
+
+    # cost fallback: if "cost" is absent or 0, use tier (Riot calls it "tier" in TFT dd)
+    final_cost = None
+    if isinstance(cost, int) and cost > 0:
+        final_cost = cost
+    elif isinstance(tier, int) and tier > 0:
+        final_cost = tier
+
+    return {
+        "slug": _maybe_suffix_slug(slug_for(name), set_num, run.all_sets),
+        "name": name,
+        "cost": final_cost,
+        "image_url": run.img_prefix["champion"] + img_full if img_full else "",
+    }
+
+
+def _item_row(_key: str, v: Dict[str, Any], run: SeedRun) -> Optional[Dict[str, Any]]:
+    # Items are a broad category and not always set-specific; we usually keep them all. :contentReference[oaicite:2]{index=2}
+    name = v.get("name") or ""
+    if not name:
+        return None
+
+    img_full = (v.get("image") or {}).get("full") or ""
+
+    # item names can collide less often; keep simple slug
+    return {
+        "slug": slug_for(name),
+        "name": name,
+        "image_url": run.img_prefix["item"] + img_full if img_full else "",
+    }
+
+
+def _augment_row(_key: str, v: Dict[str, Any], run: SeedRun) -> Optional[Dict[str, Any]]:
+    name = v.get("name") or ""
+    if not name:
+        return None
+
+    entry_id = v.get("id") or ""
+    img_full = (v.get("image") or {}).get("full") or ""
+
+    set_num = _infer_set_num(entry_id, img_full)
+    if run.skips_set(set_num):
+        return None
+
+    return {
+        "slug": _maybe_suffix_slug(slug_for(name), set_num, run.all_sets),
+        "name": name,
+        "image_url": run.img_prefix["augment"] + img_full if img_full else "",
+    }
+
+
+# Seed order: traits -> champions -> items -> augments.
+# Rows are matched on slug alone (new ones land in set_key=0).
+SEED_PASSES = (
+    SeedPass("trait", Trait, "Traits", _trait_row,
+             key_fields=("slug",), unique_fields=("game", "set_key", "slug"),
+             update_fields=("name", "image_url")),
+    SeedPass("champion", Champion, "Champs", _champion_row,
+             key_fields=("slug",), unique_fields=("game", "set_key", "slug"),
+             update_fields=("name", "cost", "image_url")),
+    SeedPass("item", Item, "Items", _item_row,
+             key_fields=("slug",), unique_fields=("game", "set_key", "kind", "slug"),
+             update_fields=("name", "image_url")),
+    SeedPass("augment", Augment, "Augments", _augment_row,
+             key_fields=("slug",), unique_fields=("game", "set_key", "slug"),
+             update_fields=("name", "image_url")),
+)
 
 
 class Command(BaseCommand):
@@ -85,19 +170,15 @@ class Command(BaseCommand):
         parser.add_argument("--all-sets", action="store_true", help="Seed all active sets (will suffix slugs to avoid collisions).")
         parser.add_argument("--include-tutorial", action="store_true", help="Include tutorial entries (normally skipped).")
         parser.add_argument("--dry-run", action="store_true", help="Print what would happen but do not write DB.")
+        parser.add_argument("--no-cache", action="store_true", help="Always re-download the Data Dragon files.")
 
     def handle(self, *args, **opts):
         game, _ = Game.objects.get_or_create(slug="tft", defaults={"name": "Teamfight Tactics"})
 
-        session = requests.Session()
-        session.headers.update(
-            {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0 Safari/537.36"
-                )
-            }
+        session = dd_session(
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/120.0 Safari/537.36"
         )
 
         ddver = (opts["ddragon"] or "latest").strip()
@@ -107,16 +188,15 @@ class Command(BaseCommand):
         dry_run = bool(opts["dry_run"])
 
         if ddver == "latest":
-            ddver = _latest_dd_version(session)
+            ddver = latest_dd_version(session)
 
         self.stdout.write(f"✅ Using Data Dragon version: {ddver}")
         self.stdout.write(f"✅ Using locale: {lang}")
 
-        # --- Load champions first so we can auto-detect set number (if desired)
-        champ_file, champ_group = FILES["champion"]
-        champ_url = DD_DATA_URL.format(ver=ddver, lang=lang, file=champ_file)
-        champ_payload = _get_json(session, champ_url)
-        champ_data: Dict[str, Any] = champ_payload.get("data", {}) or {}
+        dd = fetch_dd_data(session, ddver, lang, use_cache=not opts["no_cache"])
+
+        # --- Champions drive set auto-detection (if desired)
+        champ_data: Dict[str, Any] = dd["champion"]
 
         if not champ_data:
             self.stderr.write("❌ No champion data found in tft-champion.json")
@@ -124,9 +204,12 @@ class Command(BaseCommand):
 
         # Detect available sets in this patch
         found_sets = []
-        for _, v in champ_data.items():
-            entry_id = (v or {}).get("id", "")
-            img_full = (((v or {}).get("image") or {}).get("full") or "")
+        for v in champ_data.values():
+            if not v:
+                continue
+
+            entry_id = v.get("id") or ""
+            img_full = (v.get("image") or {}).get("full") or ""
             set_num = _infer_set_num(entry_id, img_full)
             if set_num:
                 found_sets.append(set_num)
@@ -143,216 +226,28 @@ class Command(BaseCommand):
             else:
                 self.stdout.write("✅ Seeding without set filter (no set detected)")
 
-        # Seed order: traits -> champions -> items -> augments
-        stats_traits = self._seed_traits(session, game, ddver, lang, set_filter, all_sets, dry_run)
-        stats_champs = self._seed_champions(session, game, ddver, lang, set_filter, all_sets, include_tutorial, dry_run)
-        stats_items = self._seed_items(session, game, ddver, lang, all_sets, dry_run)
-        stats_aug = self._seed_augments(session, game, ddver, lang, set_filter, all_sets, dry_run)
-
-        self.stdout.write(self.style.SUCCESS(
-            "\n🎉 Done!\n"
-            f"Traits:   added={stats_traits.added} updated={stats_traits.updated} skipped={stats_traits.skipped}\n"
-            f"Champs:   added={stats_champs.added} updated={stats_champs.updated} skipped={stats_champs.skipped}\n"
-            f"Items:    added={stats_items.added} updated={stats_items.updated} skipped={stats_items.skipped}\n"
-            f"Augments: added={stats_aug.added} updated={stats_aug.updated} skipped={stats_aug.skipped}\n"
-        ))
-
-    def _seed_traits(self, session, game, ddver, lang, set_filter: int, all_sets: bool, dry_run: bool) -> UpsertStats:
-        stats = UpsertStats()
-        file, group = FILES["trait"]
-        url = DD_DATA_URL.format(ver=ddver, lang=lang, file=file)
-        payload = _get_json(session, url)
-        data: Dict[str, Any] = payload.get("data", {}) or {}
-
-        for _, v in data.items():
-            entry_id = (v or {}).get("id", "")
-            name = (v or {}).get("name", "") or ""
-            img_full = (((v or {}).get("image") or {}).get("full") or "")
-            if not name:
-                continue
-
-            set_num = _infer_set_num(entry_id, img_full)
-            if (not all_sets) and set_filter and set_num and set_num != set_filter:
-                continue
-
-            s = _maybe_suffix_slug(slugify(name), set_num, all_sets)
-            image_url = DD_IMG_URL.format(ver=ddver, group=group, full=img_full) if img_full else ""
-
-            obj = Trait.objects.filter(game=game, slug=s).first()
-            if not obj:
-                if dry_run:
-                    stats.added += 1
-                else:
-                    Trait.objects.create(game=game, slug=s, name=name, image_url=image_url)
-                    stats.added += 1
-            else:
-                changed = False
-                if obj.name != name:
-                    obj.name = name
-                    changed = True
-                if image_url and obj.image_url != image_url:
-                    obj.image_url = image_url
-                    changed = True
-
-                if changed:
-                    if not dry_run:
-                        obj.save()
-                    stats.updated += 1
-                else:
-                    stats.skipped += 1
-
-        return stats
-
-    def _seed_champions(self, session, game, ddver, lang, set_filter: int, all_sets: bool, include_tutorial: bool, dry_run: bool) -> UpsertStats:
-        stats = UpsertStats()
-        file, group = FILES["champion"]
-        url = DD_DATA_URL.format(ver=ddver, lang=lang, file=file)
-        payload = _get_json(session, url)
-        data: Dict[str, Any] = payload.get("data", {}) or {}
-
-        for _, v in data.items():
-            entry_id = (v or {}).get("id", "")
-            name = (v or {}).get("name", "") or ""
-            tier = (v or {}).get("tier", None)
-            cost = (v or {}).get("cost", None)  # sometimes present in tutorial-ish entries
-            img_full = (((v or {}).get("image") or {}).get("full") or "")
-
-            if not name:
-                continue
-
-            if (not include_tutorial) and (TUTORIAL_ID_RE.match(entry_id) or (cost == 0 and (tier or 0) == 0)):
-                continue
-
-            set_num = _infer_set_num(entry_id, img_full)
-            if (not all_sets) and set_filter and set_num and set_num != set_filter:
-                continue
-
-            # cost fallback: if "cost" is absent or 0, use tier (Riot calls it "tier" in TFT dd)
-            final_cost = None
-            if isinstance(cost, int) and cost > 0:
-                final_cost = cost
-            elif isinstance(tier, int) and tier > 0:
-                final_cost = tier
-
-            s = _maybe_suffix_slug(slugify(name), set_num, all_sets)
-            image_url = DD_IMG_URL.format(ver=ddver, group=group, full=img_full) if img_full else ""
-
-            obj = Champion.objects.filter(game=game, slug=s).first()
-            if not obj:
-                if dry_run:
-                    stats.added += 1
-                else:
-                    Champion.objects.create(game=game, slug=s, name=name, cost=final_cost, image_url=image_url)
-                    stats.added += 1
-            else:
-                changed = False
-                if obj.name != name:
-                    obj.name = name
-                    changed = True
-                if final_cost is not None and obj.cost != final_cost:
-                    obj.cost = final_cost
-                    changed = True
-                if image_url and obj.image_url != image_url:
-                    obj.image_url = image_url
-                    changed = True
-
-                if changed:
-                    if not dry_run:
-                        obj.save()
-                    stats.updated += 1
-                else:
-                    stats.skipped += 1
-
-        return stats
-
-    def _seed_items(self, session, game, ddver, lang, all_sets: bool, dry_run: bool) -> UpsertStats:
-        # Items are a broad category and not always set-specific; we usually keep them all. :contentReference[oaicite:2]{index=2}
-        stats = UpsertStats()
-        file, group = FILES["item"]
-        url = DD_DATA_URL.format(ver=ddver, lang=lang, file=file)
-        payload = _get_json(session, url)
-        data: Dict[str, Any] = payload.get("data", {}) or {}
-
-        for _, v in data.items():
-            name = (v or {}).get("name", "") or ""
-            img_full = (((v or {}).get("image") or {}).get("full") or "")
-            if not name:
-                continue
-
-            # item names can collide less often; keep simple slug
-            s = slugify(name)
-            image_url = DD_IMG_URL.format(ver=ddver, group=group, full=img_full) if img_full else ""
-
-            obj = Item.objects.filter(game=game, slug=s).first()
-            if not obj:
-                if dry_run:
-                    stats.added += 1
-                else:
-                    Item.objects.create(game=game, slug=s, name=name, image_url=image_url)
-                    stats.added += 1
-            else:
-                changed = False
-                if obj.name != name:
-                    obj.name = name
-                    changed = True
-                if image_url and obj.image_url != image_url:
-                    obj.image_url = image_url
-                    changed = True
-
-                if changed:
-                    if not dry_run:
-                        obj.save()
-                    stats.updated += 1
-                else:
-                    stats.skipped += 1
-
-        return stats
-
-    def _seed_augments(self, session, game, ddver, lang, set_filter: int, all_sets: bool, dry_run: bool) -> UpsertStats:
-        stats = UpsertStats()
-        file, group = FILES["augment"]
-        url = DD_DATA_URL.format(ver=ddver, lang=lang, file=file)
-        payload = _get_json(session, url)
-
-        # tft-augments.json has extra keys at the top; the main list is in "data". :contentReference[oaicite:3]{index=3}
-        data: Dict[str, Any] = payload.get("data", {}) or {}
-
-        for _, v in data.items():
-            entry_id = (v or {}).get("id", "")
-            name = (v or {}).get("name", "") or ""
-            img_full = (((v or {}).get("image") or {}).get("full") or "")
-
-            if not name:
-                continue
-
-            set_num = _infer_set_num(entry_id, img_full)
-            if (not all_sets) and set_filter and set_num and set_num != set_filter:
-                continue
-
-            s = _maybe_suffix_slug(slugify(name), set_num, all_sets)
-            image_url = DD_IMG_URL.format(ver=ddver, group=group, full=img_full) if img_full else ""
+        run = SeedRun(
+            img_prefix=dd_image_prefixes(ddver),
+            set_filter=set_filter,
+            all_sets=all_sets,
+            include_tutorial=include_tutorial,
+        )
+        lines = []
+
+        # One transaction for all four passes: a single commit instead of one per statement,
+        # and a failed pass doesn't leave the catalog half-seeded.
+        with transaction.atomic():
+            for p in SEED_PASSES:
+                rows = (p.row_fn(key, v, run) for key, v in dd[p.kind].items() if v)
+                stats = upsert_entries(
+                    p.model,
+                    game,
+                    (row for row in rows if row is not None),
+                    key_fields=p.key_fields,
+                    unique_fields=p.unique_fields,
+                    update_fields=p.update_fields,
+                    dry_run=dry_run,
+                )
+                lines.append(f"{p.label + ':':<10}added={stats.added} updated={stats.updated} skipped={stats.skipped}\n")
 
-            obj = Augment.objects.filter(game=game, slug=s).first()
-            if not obj:
-                if dry_run:
-                    stats.added += 1
-                else:
-                    Augment.objects.create(game=game, slug=s, name=name, image_url=image_url)
-                    stats.added += 1
-            else:
-                changed = False
-                if obj.name != name:
-                    obj.name = name
-                    changed = True
-                if image_url and obj.image_url != image_url:
-                    obj.image_url = image_url
-                    changed = True
-
-                if changed:
-                    if not dry_run:
-                        obj.save()
-                    stats.updated += 1
-                else:
-                    stats.skipped += 1
-
-        return stats
+        self.stdout.write(self.style.SUCCESS("\n🎉 Done!\n" + "".join(lines)))
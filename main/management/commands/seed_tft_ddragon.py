@@ -1,38 +1,36 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
 
-import requests
 from django.core.management.base import BaseCommand
-from django.utils.text import slugify
-
+from django.db import transaction
+
+from ...ddragon import (
+    SET_FROM_ID_RE,
+    SET_FROM_IMAGE_RE,
+    SeedPass,
+    dd_image_prefixes,
+    dd_session,
+    fetch_dd_data,
+    latest_dd_version,
+    slug_for,
+    upsert_entries,
+)
 from ...models import Game, Champion, Item, Trait, Augment
 
 
-DD_VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
-DD_DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{ver}/data/en_US/{file}"
-DD_IMG_URL = "https://ddragon.leagueoflegends.com/cdn/{ver}/img/{group}/{full}"
-
-
 SET_FROM_KEY_RE = re.compile(r"/Sets/TFTSet(\d+)/", re.IGNORECASE)
-SET_FROM_IMAGE_RE = re.compile(r"\.TFT_Set(\d+)\.", re.IGNORECASE)
-SET_FROM_ID_RE = re.compile(r"^TFT(\d+)_", re.IGNORECASE)
 
-NAME_STARTS_WITH_LETTER_RE = re.compile(r"^[A-Za-z]")
+ITEM_ID_SET_RE = re.compile(r"^TFT\d+_Item_")
+# item_kind_and_subgroup() matches against the upper-cased id
+ITEM_SET_PREFIX_RE = re.compile(r"^TFT\d+_ITEM_")
+ITEM_SET_SUBGROUP_RE = re.compile(r"^TFT(\d+)_ITEM_([A-Z0-9]+)_")
 
 CHAMPION_SKIP_ID_RE = re.compile(r"(TraitClone|Tutorial)", re.IGNORECASE)
 
 
-def latest_dd_version(session: requests.Session) -> str:
-    r = session.get(DD_VERSIONS_URL, timeout=30)
-    r.raise_for_status()
-    versions = r.json()
-    if not versions:
-        raise RuntimeError("versions.json returned empty list")
-    return versions[0]
-
-
 def infer_set(dd_key: str, ddragon_id: str, image_full: str) -> int:
     m = SET_FROM_KEY_RE.search(dd_key or "")
     if m:
@@ -46,6 +44,11 @@ def infer_set(dd_key: str, ddragon_id: str, image_full: str) -> int:
     return 0
 
 
+def starts_with_letter(name: str) -> bool:
+    first = name.lstrip()[:1]
+    return first.isascii() and first.isalpha()
+
+
 def item_kind_and_subgroup(ddragon_id: str) -> tuple[str, str]:
     u = (ddragon_id or "").upper()
 
@@ -55,9 +58,9 @@ def item_kind_and_subgroup(ddragon_id: str) -> tuple[str, str]:
         return ("radiant", "")
 
     # Set flavored items:
-    if re.match(r"^TFT\d+_ITEM_", u):
+    if ITEM_SET_PREFIX_RE.match(u):
         # Example: TFT16_Item_Bilgewater_*
-        m = re.match(r"^TFT(\d+)_ITEM_([A-Z0-9]+)_", u)
+        m = ITEM_SET_SUBGROUP_RE.match(u)
         if m:
             subgroup = m.group(2).lower()  # bilgewater, etc
             return ("set", subgroup)
@@ -66,6 +69,157 @@ def item_kind_and_subgroup(ddragon_id: str) -> tuple[str, str]:
     return ("core", "")
 
 
+
+
+@dataclass(slots=True)
+class SeedRun:
+    img_prefix: Dict[str, str]
+    allowed_sets: set[int]
+
+
+# -------------------------
+# Entry -> row
+# Each returns the model fields for one Data Dragon entry, or None to skip it.
+# -------------------------
+def champion_row(dd_key: str, c: Dict[str, Any], run: SeedRun) -> Optional[Dict[str, Any]]:
+    name = c.get("name") or ""
+    if not name or "TFTSetTutorial" in (dd_key or ""):
+        return None
+
+    ddragon_id = c.get("id") or ""
+    if CHAMPION_SKIP_ID_RE.search(ddragon_id):
+        return None
+
+    tier = c.get("tier")
+    cost = c.get("cost")
+
+    # reject clones/oddities: require real cost (or tier fallback)
+    if isinstance(cost, int) and cost > 0:
+        cost_val = cost
+    elif isinstance(tier, int) and tier > 0:
+        cost_val = tier
+    else:
+        return None
+
+    image_full = (c.get("image") or {}).get("full") or ""
+    set_key = infer_set(dd_key, ddragon_id, image_full)
+    if run.allowed_sets and set_key not in run.allowed_sets:
+        return None
+
+    return {
+        "set_key": set_key,
+        "name": name,
+        "slug": slug_for(name),
+        "cost": cost_val,
+        "image_url": run.img_prefix["champion"] + image_full if image_full else "",
+        "ddragon_id": ddragon_id,
+        "ddragon_key": dd_key,
+        "ddragon_image_full": image_full,
+    }
+
+
+def trait_row(dd_key: str, t: Dict[str, Any], run: SeedRun) -> Optional[Dict[str, Any]]:
+    name = t.get("name") or ""
+    if not name:
+        return None
+
+    ddragon_id = t.get("id") or ""
+    image_full = (t.get("image") or {}).get("full") or ""
+
+    set_key = infer_set(dd_key, ddragon_id, image_full)
+    if run.allowed_sets and set_key != 0 and set_key not in run.allowed_sets:
+        return None
+
+    return {
+        "set_key": set_key,
+        "name": name,
+        "slug": slug_for(name),
+        "image_url": run.img_prefix["trait"] + image_full if image_full else "",
+        "ddragon_id": ddragon_id,
+        "ddragon_key": dd_key,
+        "ddragon_image_full": image_full,
+    }
+
+
+def item_row(dd_key: str, it: Dict[str, Any], run: SeedRun) -> Optional[Dict[str, Any]]:
+    # your filter: name must start with a letter
+    name = it.get("name") or ""
+    if not name or not starts_with_letter(name):
+        return None
+
+    # your filter: keep only item families we want
+    ddragon_id = it.get("id") or ""
+    if not (ddragon_id.startswith("TFT_Item_") or ITEM_ID_SET_RE.match(ddragon_id)):
+        return None
+
+    image_full = (it.get("image") or {}).get("full") or ""
+
+    kind, subgroup = item_kind_and_subgroup(ddragon_id)
+    set_key = infer_set(dd_key, ddragon_id, image_full)
+
+    # allow global items (set_key=0) always; filter set-specific by allowed sets
+    if run.allowed_sets and set_key != 0 and set_key not in run.allowed_sets:
+        return None
+
+    return {
+        "set_key": set_key,
+        "kind": kind,
+        "subgroup": subgroup,
+        "name": name,
+        "slug": slug_for(name),
+        "image_url": run.img_prefix["item"] + image_full if image_full else "",
+        "ddragon_id": ddragon_id,
+        "ddragon_key": dd_key,
+        "ddragon_image_full": image_full,
+    }
+
+
+def augment_row(dd_key: str, a: Dict[str, Any], run: SeedRun) -> Optional[Dict[str, Any]]:
+    # lots of augments are valid; just require readable name
+    name = a.get("name") or ""
+    if not name or not starts_with_letter(name):
+        return None
+
+    ddragon_id = a.get("id") or ""
+    image_full = (a.get("image") or {}).get("full") or ""
+
+    set_key = infer_set(dd_key, ddragon_id, image_full)
+    if run.allowed_sets and set_key != 0 and set_key not in run.allowed_sets:
+        return None
+
+    return {
+        "set_key": set_key,
+        "name": name,
+        "slug": slug_for(name),
+        "image_url": run.img_prefix["augment"] + image_full if image_full else "",
+        "ddragon_id": ddragon_id,
+        "ddragon_key": dd_key,
+        "ddragon_image_full": image_full,
+    }
+
+
+DD_REF_FIELDS = ("ddragon_id", "ddragon_key", "ddragon_image_full")
+
+SEED_PASSES = (
+    SeedPass("champion", Champion, "🏆 Champions", champion_row,
+             key_fields=("set_key", "slug"),
+             unique_fields=("game", "set_key", "slug"),
+             update_fields=("name", "cost", "image_url", *DD_REF_FIELDS)),
+    SeedPass("trait", Trait, "🧬 Traits", trait_row,
+             key_fields=("set_key", "slug"),
+             unique_fields=("game", "set_key", "slug"),
+             update_fields=("name", "image_url", *DD_REF_FIELDS)),
+    SeedPass("item", Item, "🧱 Items", item_row,
+             key_fields=("set_key", "kind", "slug"),
+             unique_fields=("game", "set_key", "kind", "slug"),
+             update_fields=("name", "subgroup", "image_url", *DD_REF_FIELDS)),
+    SeedPass("augment", Augment, "✨ Augments", augment_row,
+             key_fields=("set_key", "slug"),
+             unique_fields=("game", "set_key", "slug"),
+             update_fields=("name", "image_url", *DD_REF_FIELDS)),
+)
+
+
 class Command(BaseCommand):
     help = "Seed TFT Champions + Items + Traits + Augments from Data Dragon (set-aware)."
 
@@ -73,12 +227,12 @@ class Command(BaseCommand):
         parser.add_argument("--ddragon", type=str, default="latest")
         parser.add_argument("--sets", type=str, default="15,16")
         parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--no-cache", action="store_true")
 
     def handle(self, *args, **opts):
         game, _ = Game.objects.get_or_create(slug="tft", defaults={"name": "Teamfight Tactics"})
 
-        session = requests.Session()
-        session.headers.update({"User-Agent": "Mozilla/5.0"})
+        session = dd_session("Mozilla/5.0")
 
         ddver = (opts["ddragon"] or "latest").strip()
         if ddver == "latest":
@@ -91,269 +245,21 @@ class Command(BaseCommand):
         self.stdout.write(f"✅ Using Data Dragon: {ddver}")
         self.stdout.write(f"✅ Allowed sets: {sorted(allowed_sets)}")
 
-        self._seed_champions(session, game, ddver, allowed_sets, dry)
-        self._seed_traits(session, game, ddver, allowed_sets, dry)
-        self._seed_items(session, game, ddver, allowed_sets, dry)
-        self._seed_augments(session, game, ddver, allowed_sets, dry)
+        dd = fetch_dd_data(session, ddver, use_cache=not opts["no_cache"])
+        run = SeedRun(img_prefix=dd_image_prefixes(ddver), allowed_sets=allowed_sets)
+
+        with transaction.atomic():
+            for p in SEED_PASSES:
+                rows = (p.row_fn(dd_key, v, run) for dd_key, v in dd[p.kind].items() if v)
+                stats = upsert_entries(
+                    p.model,
+                    game,
+                    (row for row in rows if row is not None),
+                    key_fields=p.key_fields,
+                    unique_fields=p.unique_fields,
+                    update_fields=p.update_fields,
+                    dry_run=dry,
+                )
+                self.stdout.write(f"{p.label}: added={stats.added}, updated={stats.updated}, skipped={stats.skipped}")
 
         self.stdout.write(self.style.SUCCESS("✅ Done."))
-
-    # -------------------------
-    # Champions
-    # -------------------------
-    def _seed_champions(self, session, game, ddver: str, allowed_sets: set[int], dry: bool):
-        payload = session.get(DD_DATA_URL.format(ver=ddver, file="tft-champion.json"), timeout=30).json()
-        data: Dict[str, Any] = payload.get("data", {}) or {}
-
-        add_ = upd_ = skip_ = 0
-
-        for dd_key, c in data.items():
-            ddragon_id = (c or {}).get("id", "") or ""
-            name = (c or {}).get("name", "") or ""
-            tier = (c or {}).get("tier", None)
-            cost = (c or {}).get("cost", None)
-            image_full = (((c or {}).get("image") or {}).get("full") or "")
-
-            if not name or CHAMPION_SKIP_ID_RE.search(ddragon_id) or "TFTSetTutorial" in (dd_key or ""):
-                continue
-
-            # reject clones/oddities: require real cost (or tier fallback)
-            if isinstance(cost, int) and cost > 0:
-                cost_val = cost
-            elif isinstance(tier, int) and tier > 0:
-                cost_val = tier
-            else:
-                continue
-
-            set_key = infer_set(dd_key, ddragon_id, image_full)
-            if allowed_sets and set_key not in allowed_sets:
-                continue
-
-            image_url = DD_IMG_URL.format(ver=ddver, group="tft-champion", full=image_full) if image_full else ""
-            slug = slugify(name)
-
-            obj = Champion.objects.filter(game=game, set_key=set_key, slug=slug).first()
-            if not obj:
-                if not dry:
-                    Champion.objects.create(
-                        game=game,
-                        set_key=set_key,
-                        name=name,
-                        slug=slug,
-                        cost=cost_val,
-                        image_url=image_url,
-                        ddragon_id=ddragon_id,
-                        ddragon_key=dd_key,
-                        ddragon_image_full=image_full,
-                    )
-                add_ += 1
-            else:
-                changed = False
-                for field, val in [
-                    ("name", name),
-                    ("cost", cost_val),
-                    ("image_url", image_url),
-                    ("ddragon_id", ddragon_id),
-                    ("ddragon_key", dd_key),
-                    ("ddragon_image_full", image_full),
-                ]:
-                    if val and getattr(obj, field) != val:
-                        setattr(obj, field, val)
-                        changed = True
-                if changed:
-                    if not dry:
-                        obj.save()
-                    upd_ += 1
-                else:
-                    skip_ += 1
-
-        self.stdout.write(f"🏆 Champions: added={add_}, updated={upd_}, skipped={skip_}")
-
-    # -------------------------
-    # Traits
-    # -------------------------
-    def _seed_traits(self, session, game, ddver: str, allowed_sets: set[int], dry: bool):
-        payload = session.get(DD_DATA_URL.format(ver=ddver, file="tft-trait.json"), timeout=30).json()
-        data: Dict[str, Any] = payload.get("data", {}) or {}
-
-        add_ = upd_ = skip_ = 0
-
-        for dd_key, t in data.items():
-            ddragon_id = (t or {}).get("id", "") or ""
-            name = (t or {}).get("name", "") or ""
-            image_full = (((t or {}).get("image") or {}).get("full") or "")
-
-            if not name:
-                continue
-
-            set_key = infer_set(dd_key, ddragon_id, image_full)
-            if allowed_sets and set_key != 0 and set_key not in allowed_sets:
-                continue
-
-            image_url = DD_IMG_URL.format(ver=ddver, group="tft-trait", full=image_full) if image_full else ""
-            slug = slugify(name)
-
-            obj = Trait.objects.filter(game=game, set_key=set_key, slug=slug).first()
-            if not obj:
-                if not dry:
-                    Trait.objects.create(
-                        game=game,
-                        set_key=set_key,
-                        name=name,
-                        slug=slug,
-                        image_url=image_url,
-                        ddragon_id=ddragon_id,
-                        ddragon_key=dd_key,
-                        ddragon_image_full=image_full,
-                    )
-                add_ += 1
-            else:
-                changed = False
-                for field, val in [
-                    ("name", name),
-                    ("image_url", image_url),
-                    ("ddragon_id", ddragon_id),
-                    ("ddragon_key", dd_key),
-                    ("ddragon_image_full", image_full),
-                ]:
-                    if val and getattr(obj, field) != val:
-                        setattr(obj, field, val)
-                        changed = True
-                if changed:
-                    if not dry:
-                        obj.save()
-                    upd_ += 1
-                else:
-                    skip_ += 1
-
-        self.stdout.write(f"🧬 Traits: added={add_}, updated={upd_}, skipped={skip_}")
-
-    # -------------------------
-    # Items
-    # -------------------------
-    def _seed_items(self, session, game, ddver: str, allowed_sets: set[int], dry: bool):
-        payload = session.get(DD_DATA_URL.format(ver=ddver, file="tft-item.json"), timeout=30).json()
-        data: Dict[str, Any] = payload.get("data", {}) or {}
-
-        add_ = upd_ = skip_ = 0
-
-        for dd_key, it in data.items():
-            ddragon_id = (it or {}).get("id", "") or ""
-            name = (it or {}).get("name", "") or ""
-            image_full = (((it or {}).get("image") or {}).get("full") or "")
-
-            # your filter: name must start with a letter
-            if not name or not NAME_STARTS_WITH_LETTER_RE.match(name.strip()):
-                continue
-
-            # your filter: keep only item families we want
-            if not (ddragon_id.startswith("TFT_Item_") or re.match(r"^TFT\d+_Item_", ddragon_id)):
-                continue
-
-            kind, subgroup = item_kind_and_subgroup(ddragon_id)
-            set_key = infer_set(dd_key, ddragon_id, image_full)
-
-            # allow global items (set_key=0) always; filter set-specific by allowed sets
-            if allowed_sets and set_key != 0 and set_key not in allowed_sets:
-                continue
-
-            image_url = DD_IMG_URL.format(ver=ddver, group="tft-item", full=image_full) if image_full else ""
-            slug = slugify(name)
-
-            obj = Item.objects.filter(game=game, set_key=set_key, kind=kind, slug=slug).first()
-            if not obj:
-                if not dry:
-                    Item.objects.create(
-                        game=game,
-                        set_key=set_key,
-                        kind=kind,
-                        subgroup=subgroup,
-                        name=name,
-                        slug=slug,
-                        image_url=image_url,
-                        ddragon_id=ddragon_id,
-                        ddragon_key=dd_key,
-                        ddragon_image_full=image_full,
-                    )
-                add_ += 1
-            else:
-                changed = False
-                for field, val in [
-                    ("name", name),
-                    ("subgroup", subgroup),
-                    ("image_url", image_url),
-                    ("ddragon_id", ddragon_id),
-                    ("ddragon_key", dd_key),
-                    ("ddragon_image_full", image_full),
-                ]:
-                    if val and getattr(obj, field) != val:
-                        setattr(obj, field, val)
-                        changed = True
-                if changed:
-                    if not dry:
-                        obj.save()
-                    upd_ += 1
-                else:
-                    skip_ += 1
-
-        self.stdout.write(f"🧱 Items: added={add_}, updated={upd_}, skipped={skip_}")
-
-    # -------------------------
-    # Augments
-    # -------------------------
-    def _seed_augments(self, session, game, ddver: str, allowed_sets: set[int], dry: bool):
-        payload = session.get(DD_DATA_URL.format(ver=ddver, file="tft-augments.json"), timeout=30).json()
-        data: Dict[str, Any] = payload.get("data", {}) or {}
-
-        add_ = upd_ = skip_ = 0
-
-        for dd_key, a in data.items():
-            ddragon_id = (a or {}).get("id", "") or ""
-            name = (a or {}).get("name", "") or ""
-            image_full = (((a or {}).get("image") or {}).get("full") or "")
-
-            # lots of augments are valid; just require readable name
-            if not name or not NAME_STARTS_WITH_LETTER_RE.match(name.strip()):
-                continue
-
-            set_key = infer_set(dd_key, ddragon_id, image_full)
-            if allowed_sets and set_key != 0 and set_key not in allowed_sets:
-                continue
-
-            image_url = DD_IMG_URL.format(ver=ddver, group="tft-augment", full=image_full) if image_full else ""
-            slug = slugify(name)
-
-            obj = Augment.objects.filter(game=game, set_key=set_key, slug=slug).first()
-            if not obj:
-                if not dry:
-                    Augment.objects.create(
-                        game=game,
-                        set_key=set_key,
-                        name=name,
-                        slug=slug,
-                        image_url=image_url,
-                        ddragon_id=ddragon_id,
-                        ddragon_key=dd_key,
-                        ddragon_image_full=image_full,
-                    )
-                add_ += 1
-            else:
-                changed = False
-                for field, val in [
-                    ("name", name),
-                    ("image_url", image_url),
-                    ("ddragon_id", ddragon_id),
-                    ("ddragon_key", dd_key),
-                    ("ddragon_image_full", image_full),
-                ]:
-                    if val and getattr(obj, field) != val:
-                        setattr(obj, field, val)
-                        changed = True
-                if changed:
-                    if not dry:
-                        obj.save()
-                    upd_ += 1
-                else:
-                    skip_ += 1
-
-        self.stdout.write(f"✨ Augments: added={add_}, updated={upd_}, skipped={skip_}")
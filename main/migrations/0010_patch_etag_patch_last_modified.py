@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-15 17:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_alter_item_options_remove_item_uniq_item_game_slug_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patch',
+            name='etag',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='patch',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
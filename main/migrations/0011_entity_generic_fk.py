@@ -0,0 +1,120 @@
+# Generated by Django 5.2.10 on 2026-10-15 17:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+ENTITY_FIELDS = ("champion", "item", "trait", "augment")
+
+
+def copy_fks_to_generic(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    for model_name in ("EntityChange", "Feedback"):
+        model = apps.get_model("main", model_name)
+        for field in ENTITY_FIELDS:
+            ct = ContentType.objects.get_for_model(apps.get_model("main", field))
+            model.objects.filter(**{f"{field}__isnull": False}).update(
+                content_type=ct, object_id=models.F(f"{field}_id")
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('main', '0010_patch_etag_patch_last_modified'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entitychange',
+            name='content_type',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AddField(
+            model_name='entitychange',
+            name='object_id',
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='content_type',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='object_id',
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.RunPython(copy_fks_to_generic, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='entitychange',
+            name='entitychange_exactly_one_fk',
+        ),
+        migrations.RemoveConstraint(
+            model_name='feedback',
+            name='feedback_exactly_one_fk',
+        ),
+        migrations.RemoveField(
+            model_name='entitychange',
+            name='augment',
+        ),
+        migrations.RemoveField(
+            model_name='entitychange',
+            name='champion',
+        ),
+        migrations.RemoveField(
+            model_name='entitychange',
+            name='item',
+        ),
+        migrations.RemoveField(
+            model_name='entitychange',
+            name='trait',
+        ),
+        migrations.RemoveField(
+            model_name='feedback',
+            name='augment',
+        ),
+        migrations.RemoveField(
+            model_name='feedback',
+            name='champion',
+        ),
+        migrations.RemoveField(
+            model_name='feedback',
+            name='item',
+        ),
+        migrations.RemoveField(
+            model_name='feedback',
+            name='trait',
+        ),
+        migrations.AlterField(
+            model_name='entitychange',
+            name='content_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AlterField(
+            model_name='entitychange',
+            name='object_id',
+            field=models.PositiveBigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='content_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='object_id',
+            field=models.PositiveBigIntegerField(),
+        ),
+        migrations.AddIndex(
+            model_name='entitychange',
+            index=models.Index(fields=['content_type', 'object_id'], name='main_entity_content_84b496_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['content_type', 'object_id'], name='main_feedba_content_46cbaf_idx'),
+        ),
+    ]
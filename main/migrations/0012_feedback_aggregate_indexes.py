@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-15 17:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('main', '0011_entity_generic_fk'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='feedback',
+            name='main_feedba_patch_i_1a4519_idx',
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['patch', 'content_type', 'object_id', 'vote'], name='main_feedba_patch_i_24c014_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['patch', 'entity_type', 'created_at'], name='main_feedba_patch_i_cd45f4_idx'),
+        ),
+    ]
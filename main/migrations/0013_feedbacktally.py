@@ -0,0 +1,44 @@
+# Generated by Django 5.2.10 on 2026-10-15 17:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_tallies(apps, schema_editor):
+    Feedback = apps.get_model("main", "Feedback")
+    FeedbackTally = apps.get_model("main", "FeedbackTally")
+    rows = (
+        Feedback.objects.values("patch_id", "content_type_id", "object_id", "vote")
+        .annotate(n=models.Count("id"), entity_type=models.Max("entity_type"))
+        .order_by()
+    )
+    FeedbackTally.objects.bulk_create(
+        [FeedbackTally(count=r.pop("n"), **r) for r in rows], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('main', '0012_feedback_aggregate_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('champion', 'Champion'), ('item', 'Item'), ('trait', 'Trait'), ('augment', 'Augment')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('vote', models.CharField(choices=[('buff', 'Buff'), ('nerf', 'Nerf'), ('fine', 'Fine'), ('rework', 'Rework')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('patch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feedback_tallies', to='main.patch')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('patch', 'content_type', 'object_id', 'vote'), name='uniq_feedbacktally_patch_entity_vote')],
+            },
+        ),
+        migrations.RunPython(backfill_tallies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.10 on 2026-10-15 17:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+ENTITY_MODELS = ("champion", "item", "trait", "augment")
+
+
+def backfill_game_and_set(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Patch = apps.get_model("main", "Patch")
+    patch_game = Subquery(Patch.objects.filter(pk=OuterRef("patch_id")).values("game_id")[:1])
+
+    apps.get_model("main", "PatchSection").objects.update(game_id=patch_game)
+    for model_name in ("EntityChange", "Feedback"):
+        model = apps.get_model("main", model_name)
+        model.objects.update(game_id=patch_game)
+        for entity_name in ENTITY_MODELS:
+            entity_model = apps.get_model("main", entity_name)
+            ct = ContentType.objects.get_for_model(entity_model)
+            model.objects.filter(content_type=ct).update(
+                set_key=Subquery(entity_model.objects.filter(pk=OuterRef("object_id")).values("set_key")[:1])
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('main', '0013_feedbacktally'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entitychange',
+            name='game',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='entity_changes', to='main.game'),
+        ),
+        migrations.AddField(
+            model_name='entitychange',
+            name='set_key',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='game',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='feedback', to='main.game'),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='set_key',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='patchsection',
+            name='game',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='patch_sections', to='main.game'),
+        ),
+        migrations.RunPython(backfill_game_and_set, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='entitychange',
+            name='game',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='entity_changes', to='main.game'),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='game',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='feedback', to='main.game'),
+        ),
+        migrations.AlterField(
+            model_name='patchsection',
+            name='game',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='patch_sections', to='main.game'),
+        ),
+        migrations.AddIndex(
+            model_name='entitychange',
+            index=models.Index(fields=['game', 'set_key', 'entity_type'], name='main_entity_game_id_e03cd9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['game', 'set_key', 'entity_type'], name='main_feedba_game_id_610243_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patchsection',
+            index=models.Index(fields=['game', 'category'], name='main_patchs_game_id_d0c0cf_idx'),
+        ),
+    ]
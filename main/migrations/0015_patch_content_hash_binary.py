@@ -0,0 +1,48 @@
+# Generated by Django 5.2.10 on 2026-10-15 17:58
+
+from django.db import migrations, models
+
+
+def hex_to_digest(apps, schema_editor):
+    Patch = apps.get_model("main", "Patch")
+    patches = list(Patch.objects.exclude(content_hash="").only("id", "content_hash"))
+    for p in patches:
+        try:
+            p.content_hash_bin = bytes.fromhex(p.content_hash)
+        except ValueError:
+            # not a hex digest; leave it empty so the next fetch re-hashes the page
+            p.content_hash_bin = b""
+    Patch.objects.bulk_update(patches, ["content_hash_bin"], batch_size=500)
+
+
+def digest_to_hex(apps, schema_editor):
+    Patch = apps.get_model("main", "Patch")
+    patches = list(Patch.objects.only("id", "content_hash_bin"))
+    for p in patches:
+        p.content_hash = bytes(p.content_hash_bin).hex()
+    Patch.objects.bulk_update(patches, ["content_hash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_denormalize_game_set'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patch',
+            name='content_hash_bin',
+            field=models.BinaryField(blank=True, max_length=32),
+        ),
+        migrations.RunPython(hex_to_digest, digest_to_hex),
+        migrations.RemoveField(
+            model_name='patch',
+            name='content_hash',
+        ),
+        migrations.RenameField(
+            model_name='patch',
+            old_name='content_hash_bin',
+            new_name='content_hash',
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.10 on 2026-10-15 18:06
+
+import main.fields
+from django.db import migrations
+
+
+def copy_columns(src_text, src_html, dst_text, dst_html):
+    def copy(apps, schema_editor):
+        Patch = apps.get_model("main", "Patch")
+        patches = list(Patch.objects.only("id", src_text, src_html))
+        for p in patches:
+            setattr(p, dst_text, getattr(p, src_text) or "")
+            setattr(p, dst_html, getattr(p, src_html))
+        Patch.objects.bulk_update(patches, [dst_text, dst_html], batch_size=100)
+    return copy
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_patch_content_hash_binary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patch',
+            name='raw_text_z',
+            field=main.fields.CompressedTextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='patch',
+            name='raw_html_z',
+            field=main.fields.CompressedTextField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            copy_columns("raw_text", "raw_html", "raw_text_z", "raw_html_z"),
+            copy_columns("raw_text_z", "raw_html_z", "raw_text", "raw_html"),
+        ),
+        migrations.RemoveField(
+            model_name='patch',
+            name='raw_text',
+        ),
+        migrations.RemoveField(
+            model_name='patch',
+            name='raw_html',
+        ),
+        migrations.RenameField(
+            model_name='patch',
+            old_name='raw_text_z',
+            new_name='raw_text',
+        ),
+        migrations.RenameField(
+            model_name='patch',
+            old_name='raw_html_z',
+            new_name='raw_html',
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-15 18:00
+
+import re
+
+from django.db import migrations, models
+
+
+VERSION_RE = re.compile(r"^(\d+)\.(\d+)$")
+
+
+def backfill_version_parts(apps, schema_editor):
+    Patch = apps.get_model("main", "Patch")
+    patches = list(Patch.objects.only("id", "version"))
+    for p in patches:
+        m = VERSION_RE.match((p.version or "").strip())
+        p.version_major, p.version_minor = (int(m[1]), int(m[2])) if m else (0, 0)
+    Patch.objects.bulk_update(patches, ["version_major", "version_minor"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_patch_compress_raw_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patch',
+            name='version_major',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='patch',
+            name='version_minor',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_version_parts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='patch',
+            index=models.Index(fields=['game', 'version_major', 'version_minor'], name='main_patch_game_id_bbed7c_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.10 on 2026-10-15 18:21
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_set_key(apps, schema_editor):
+    Patch = apps.get_model("main", "Patch")
+    apps.get_model("main", "PatchSection").objects.update(
+        set_key=Subquery(Patch.objects.filter(pk=OuterRef("patch_id")).values("version_major")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_patch_version_major_minor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patchsection',
+            name='set_key',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_set_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='patchsection',
+            index=models.Index(fields=['game', 'set_key', 'category'], name='main_patchs_game_id_12dad8_idx'),
+        ),
+    ]
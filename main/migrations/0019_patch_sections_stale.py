@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-15 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0018_patchsection_set_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patch',
+            name='sections_stale',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
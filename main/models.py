@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import re
+
 from django.db import models
 
 from django.contrib.auth.models import User
@@ -7,8 +10,42 @@ from django.contrib.auth.models import User
 
 
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Q
+
+from .fields import CompressedTextField
+
+
+class LoadedValuesMixin:
+    """
+    Remembers the values of `tracked_fields` as loaded from (or last saved to)
+    the database, so save() can tell whether they changed without a query.
+    """
+
+    tracked_fields: tuple[str, ...] = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if set(cls.tracked_fields) <= set(field_names):  # never load a deferred field here
+            instance.remember_loaded_values()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        if not set(self.tracked_fields) & self.get_deferred_fields():
+            self.remember_loaded_values()
+
+    def remember_loaded_values(self) -> None:
+        self._loaded_values = {f: getattr(self, f) for f in self.tracked_fields}
+
+    def changed_since_load(self, *fields: str) -> bool:
+        # True when unknown (new instance, or loaded with the field deferred)
+        loaded = getattr(self, "_loaded_values", None)
+        return loaded is None or any(loaded[f] != getattr(self, f) for f in fields)
 
 
 # =========================================================
@@ -57,35 +94,99 @@ class GameImage(models.Model):
         return f"{self.game.slug} ({self.kind})"
 
 
-class Patch(models.Model):
+class PatchQuerySet(models.QuerySet):
+    def for_detail(self, size: str | None = None, category: str | None = None, changes: bool = True):
+        """
+        Patches with their sections and (unless changes=False) entity changes
+        prefetched, optionally narrowed to one size/category so a sub-page
+        doesn't pull every row of the patch.
+        """
+        sections = PatchSection.objects.order_by("order", "id")
+        if size:
+            sections = sections.filter(size=size)
+        if category:
+            sections = sections.filter(category=category)
+        lookups = [models.Prefetch("sections", queryset=sections)]
+
+        if changes:
+            entity_changes = EntityChange.objects.with_related()
+            if size:
+                entity_changes = entity_changes.filter(size=size)
+            lookups.append(models.Prefetch("entity_changes", queryset=entity_changes))
+        return self.prefetch_related(*lookups)
+
+
+PATCH_VERSION_RE = re.compile(r"^(\d+)\.(\d+)$")
+
+
+class Patch(LoadedValuesMixin, models.Model):
     """
     Canonical patch source (raw HTML/text stays here).
     """
     game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="patches")
     version = models.CharField(max_length=50)
+    # "16.4" split into numbers so lists sort in SQL; 0/0 for unknown formats
+    version_major = models.PositiveIntegerField(default=0, editable=False)
+    version_minor = models.PositiveIntegerField(default=0, editable=False)
 
     released_at = models.DateField(null=True, blank=True)
     source_url = models.URLField(blank=True)
 
-    raw_text = models.TextField(blank=True)
-    raw_html = models.TextField(blank=True, null=True)
+    # full page text/markup, stored compressed (see main/fields.py)
+    raw_text = CompressedTextField(blank=True)
+    raw_html = CompressedTextField(blank=True, null=True)
 
-    content_hash = models.CharField(max_length=64, blank=True)
+    content_hash = models.BinaryField(max_length=32, blank=True)  # raw SHA-256 digest
+    # raw_html was edited after its sections were built; reparse_tft_patches rebuilds them
+    sections_stale = models.BooleanField(default=False, editable=False)
     source_slug = models.CharField(max_length=200, blank=True)
 
+    # HTTP validators from the last fetch (for conditional GET)
+    etag = models.CharField(max_length=200, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PatchQuerySet.as_manager()
+
     class Meta:
         unique_together = ("game", "version")
         ordering = ["-updated_at", "-created_at"]
         indexes = [
             models.Index(fields=["game", "version"]),
+            models.Index(fields=["game", "version_major", "version_minor"]),
         ]
 
     def __str__(self) -> str:
         return f"{self.game.slug} {self.version}"
 
+    tracked_fields = ("raw_html",)
+
+    def save(self, *args, **kwargs):
+        self.fill_version_parts()
+        update_fields = kwargs.get("update_fields")
+        html_saved = update_fields is None or "raw_html" in update_fields
+        # a deferred raw_html wasn't touched; don't load it just to compare
+        if html_saved and "raw_html" not in self.get_deferred_fields() and self.changed_since_load("raw_html"):
+            self.content_hash = hashlib.sha256((self.raw_html or "").encode("utf-8")).digest()
+            if not self._state.adding:
+                self.sections_stale = True
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "content_hash", "sections_stale"}
+        super().save(*args, **kwargs)
+        if "raw_html" not in self.get_deferred_fields():
+            self.remember_loaded_values()
+
+    def fill_version_parts(self) -> None:
+        # save() calls this; bulk_create callers must call it themselves
+        m = PATCH_VERSION_RE.match((self.version or "").strip())
+        self.version_major, self.version_minor = (int(m[1]), int(m[2])) if m else (0, 0)
+
+    @property
+    def content_hash_hex(self) -> str:
+        return bytes(self.content_hash).hex()
+
 
 # =========================================================
 # Patch sections (preserve structure: Large/Small + headings)
@@ -102,8 +203,12 @@ PATCH_SECTION_CATEGORIES = [
 PATCH_SECTION_SIZES = [("all", "All"), ("large", "Large"), ("small", "Small")]
 
 
-class PatchSection(models.Model):
+class PatchSection(LoadedValuesMixin, models.Model):
     patch = models.ForeignKey(Patch, on_delete=models.CASCADE, related_name="sections")
+    # copies of patch.game_id and patch.version_major, so per-game/per-set
+    # section queries skip the Patch join
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="patch_sections", editable=False)
+    set_key = models.PositiveSmallIntegerField(default=0, editable=False)
 
     category = models.CharField(max_length=20, choices=PATCH_SECTION_CATEGORIES)
     size = models.CharField(max_length=10, choices=PATCH_SECTION_SIZES, default="all")
@@ -121,11 +226,22 @@ class PatchSection(models.Model):
         ordering = ["order", "id"]
         indexes = [
             models.Index(fields=["patch", "category", "size"]),
+            models.Index(fields=["game", "category"]),
+            models.Index(fields=["game", "set_key", "category"]),
         ]
 
+    tracked_fields = ("patch_id",)
+
     def __str__(self) -> str:
         return f"{self.patch} [{self.category}/{self.size}] #{self.order}"
 
+    def save(self, *args, **kwargs):
+        if self.changed_since_load("patch_id"):
+            self.game_id = self.patch.game_id
+            self.set_key = self.patch.version_major
+        super().save(*args, **kwargs)
+        self.remember_loaded_values()
+
 
 # =========================================================
 # TFT Entities (champions/items/traits/augments)
@@ -145,6 +261,10 @@ class Trait(models.Model):
     ddragon_key = models.CharField(max_length=500, blank=True)
     ddragon_image_full = models.CharField(max_length=200, blank=True)
 
+    # reverse side of EntityChange.entity / Feedback.entity (also cascades deletes)
+    entity_changes = GenericRelation("EntityChange")
+    feedback = GenericRelation("Feedback")
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["game", "set_key", "slug"], name="uniq_trait_game_set_slug"),
@@ -169,6 +289,9 @@ class Augment(models.Model):
     ddragon_key = models.CharField(max_length=500, blank=True)
     ddragon_image_full = models.CharField(max_length=200, blank=True)
 
+    entity_changes = GenericRelation("EntityChange")
+    feedback = GenericRelation("Feedback")
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["game", "set_key", "slug"], name="uniq_augment_game_set_slug"),
@@ -194,6 +317,9 @@ class Champion(models.Model):
     ddragon_key = models.CharField(max_length=500, blank=True)
     ddragon_image_full = models.CharField(max_length=200, blank=True)
 
+    entity_changes = GenericRelation("EntityChange")
+    feedback = GenericRelation("Feedback")
+
     traits = models.ManyToManyField("Trait", blank=True, related_name="champions")
 
     class Meta:
@@ -233,6 +359,9 @@ class Item(models.Model):
     ddragon_key = models.CharField(max_length=500, blank=True)
     ddragon_image_full = models.CharField(max_length=200, blank=True)
 
+    entity_changes = GenericRelation("EntityChange")
+    feedback = GenericRelation("Feedback")
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=["game", "set_key", "kind", "slug"], name="uniq_item_game_set_kind_slug"),
@@ -246,7 +375,47 @@ class Item(models.Model):
 # Derived links: patch -> entity + snippet
 # =========================================================
 
-class EntityChange(models.Model):
+def _entity_prefetch() -> GenericPrefetch:
+    return GenericPrefetch(
+        "entity",
+        [Champion.objects.all(), Item.objects.all(), Trait.objects.all(), Augment.objects.all()],
+    )
+
+
+def _fill_game_and_set(obj) -> None:
+    # game/set_key on EntityChange and Feedback are copies of patch.game_id and
+    # the entity's set_key, so "everything for game X, set N" is one index range
+    # scan. Recomputed on save() when the row is new or moved to another
+    # patch/entity (no extra queries otherwise); bulk_create callers must set
+    # them themselves.
+    if obj.changed_since_load("patch_id"):
+        obj.game_id = obj.patch.game_id
+    if obj.changed_since_load("content_type_id", "object_id"):
+        # entity_type is the content type's model name, never set on its own
+        obj.entity_type = ContentType.objects.get_for_id(obj.content_type_id).model
+        entity = obj.entity
+        if entity is not None:
+            obj.set_key = entity.set_key
+
+
+def _clean_entity(obj) -> None:
+    if obj.content_type_id is None or obj.object_id is None:
+        return  # reported as missing by the field validation
+    ct = ContentType.objects.get_for_id(obj.content_type_id)
+    if ct.model not in dict(EntityChange.ENTITY_CHOICES) or ct.app_label != obj._meta.app_label:
+        raise ValidationError({"content_type": f"{ct} is not a champion, item, trait or augment."})
+    if not ct.model_class()._default_manager.filter(pk=obj.object_id).exists():
+        raise ValidationError({"object_id": f"No {ct.model} with id {obj.object_id}."})
+    obj.entity_type = ct.model
+
+
+class EntityChangeQuerySet(models.QuerySet):
+    def with_related(self):
+        # FKs in one JOINed query, entities in one query per entity model
+        return self.select_related("patch", "section").prefetch_related(_entity_prefetch())
+
+
+class EntityChange(LoadedValuesMixin, models.Model):
     ENTITY_CHOICES = [
         ("champion", "Champion"),
         ("item", "Item"),
@@ -259,40 +428,50 @@ class EntityChange(models.Model):
 
     entity_type = models.CharField(max_length=10, choices=ENTITY_CHOICES)
 
-    champion = models.ForeignKey(Champion, null=True, blank=True, on_delete=models.CASCADE)
-    item = models.ForeignKey(Item, null=True, blank=True, on_delete=models.CASCADE)
-    trait = models.ForeignKey(Trait, null=True, blank=True, on_delete=models.CASCADE)
-    augment = models.ForeignKey(Augment, null=True, blank=True, on_delete=models.CASCADE)
+    # The Champion/Item/Trait/Augment this row is about (entity_type says which)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    entity = GenericForeignKey("content_type", "object_id")
+
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="entity_changes", editable=False)
+    set_key = models.PositiveSmallIntegerField(default=0, editable=False)
 
     snippet = models.TextField()
     size = models.CharField(max_length=10, choices=PATCH_SECTION_SIZES, default="all")
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = EntityChangeQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=["entity_type", "patch"]),
             models.Index(fields=["patch", "size"]),
+            models.Index(fields=["content_type", "object_id"]),
+            models.Index(fields=["game", "set_key", "entity_type"]),
         ]
-        constraints = [
-            # Exactly one FK must be set
-            models.CheckConstraint(
-                name="entitychange_exactly_one_fk",
-                check=(
-                    (Q(champion__isnull=False) & Q(item__isnull=True) & Q(trait__isnull=True) & Q(augment__isnull=True)) |
-                    (Q(champion__isnull=True) & Q(item__isnull=False) & Q(trait__isnull=True) & Q(augment__isnull=True)) |
-                    (Q(champion__isnull=True) & Q(item__isnull=True) & Q(trait__isnull=False) & Q(augment__isnull=True)) |
-                    (Q(champion__isnull=True) & Q(item__isnull=True) & Q(trait__isnull=True) & Q(augment__isnull=False))
-                )
-            )
-        ]
+
+    tracked_fields = ("patch_id", "content_type_id", "object_id")
+
+    def clean(self):
+        _clean_entity(self)
+
+    def save(self, *args, **kwargs):
+        _fill_game_and_set(self)
+        super().save(*args, **kwargs)
+        self.remember_loaded_values()
 
 
 # =========================================================
 # Feedback / voting (rewired to TFT entities)
 # =========================================================
 
-class Feedback(models.Model):
+class FeedbackQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related("patch", "user").prefetch_related(_entity_prefetch())
+
+
+class Feedback(LoadedValuesMixin, models.Model):
     """
     A user vote about balance for a specific entity in a specific patch.
     """
@@ -318,10 +497,12 @@ class Feedback(models.Model):
     )
 
 
-    champion = models.ForeignKey(Champion, null=True, blank=True, on_delete=models.CASCADE)
-    item = models.ForeignKey(Item, null=True, blank=True, on_delete=models.CASCADE)
-    trait = models.ForeignKey(Trait, null=True, blank=True, on_delete=models.CASCADE)
-    augment = models.ForeignKey(Augment, null=True, blank=True, on_delete=models.CASCADE)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    entity = GenericForeignKey("content_type", "object_id")
+
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="feedback", editable=False)
+    set_key = models.PositiveSmallIntegerField(default=0, editable=False)
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -339,22 +520,56 @@ class Feedback(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = FeedbackQuerySet.as_manager()
+
     class Meta:
         indexes = [
-            models.Index(fields=["patch", "entity_type"]),
+            models.Index(fields=["content_type", "object_id"]),
+            # vote histogram per entity on a patch page: GROUP BY entity, vote
+            models.Index(fields=["patch", "content_type", "object_id", "vote"]),
+            # "recent feedback on this patch" timeline; also serves (patch, entity_type) lookups
+            models.Index(fields=["patch", "entity_type", "created_at"]),
+            models.Index(fields=["game", "set_key", "entity_type"]),
         ]
+
+    tracked_fields = ("patch_id", "content_type_id", "object_id")
+
+    def clean(self):
+        _clean_entity(self)
+
+    def save(self, *args, **kwargs):
+        _fill_game_and_set(self)
+        super().save(*args, **kwargs)
+        self.remember_loaded_values()
+
+
+class FeedbackTally(models.Model):
+    """
+    Running vote count per (patch, entity, vote), kept in step with Feedback
+    by the signals in main/signals.py so patch pages read one row per entity
+    instead of counting Feedback rows.
+    """
+
+    patch = models.ForeignKey(Patch, on_delete=models.CASCADE, related_name="feedback_tallies")
+    entity_type = models.CharField(max_length=10, choices=EntityChange.ENTITY_CHOICES)
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    entity = GenericForeignKey("content_type", "object_id")
+
+    vote = models.CharField(max_length=10, choices=Feedback.CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
         constraints = [
-            models.CheckConstraint(
-                name="feedback_exactly_one_fk",
-                check=(
-                    (Q(champion__isnull=False) & Q(item__isnull=True) & Q(trait__isnull=True) & Q(augment__isnull=True)) |
-                    (Q(champion__isnull=True) & Q(item__isnull=False) & Q(trait__isnull=True) & Q(augment__isnull=True)) |
-                    (Q(champion__isnull=True) & Q(item__isnull=True) & Q(trait__isnull=False) & Q(augment__isnull=True)) |
-                    (Q(champion__isnull=True) & Q(item__isnull=True) & Q(trait__isnull=True) & Q(augment__isnull=False))
-                )
-            )
+            models.UniqueConstraint(
+                fields=["patch", "content_type", "object_id", "vote"], name="uniq_feedbacktally_patch_entity_vote"
+            ),
         ]
 
+    def __str__(self) -> str:
+        return f"{self.patch} {self.entity_type}#{self.object_id} {self.vote}={self.count}"
+
 
 # =========================================================
 # Accounts / suggestions (kept)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, Generic, Hashable, Iterable, List, Tuple, TypeVar
+
+try:
+    import ahocorasick
+except ImportError:  # one regex alternation instead; still a single scan per text
+    ahocorasick = None
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+def _is_word(ch: str) -> bool:
+    # what the regex's \w means, so both backends agree on word boundaries
+    return ch.isalnum() or ch == "_"
+
+
+class EntityMatcher(Generic[T]):
+    """
+    Finds known entity names (champions, items, ...) in patch-note text with
+    one pass over the text, however many names there are.
+
+    Matching is case-insensitive, on whole words, leftmost-longest: with both
+    "Jarvan" and "Jarvan IV" known, "Jarvan IV" wins. Pure Python, no Django.
+    """
+
+    def __init__(self, names: Iterable[Tuple[str, T]]):
+        by_name: Dict[str, List[T]] = {}
+        for name, value in names:
+            key = name.strip().lower()
+            if len(key) >= 2:
+                by_name.setdefault(key, []).append(value)
+        self._by_name = by_name
+
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for key in by_name:
+                self._automaton.add_word(key, key)
+            if by_name:
+                self._automaton.make_automaton()
+            self._re = None
+        else:
+            self._automaton = None
+            # longest first so the alternation prefers "Jarvan IV" over "Jarvan"
+            alternation = "|".join(re.escape(k) for k in sorted(by_name, key=len, reverse=True))
+            self._re = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE) if by_name else None
+
+    def _names_in(self, text: str) -> Iterable[str]:
+        if self._automaton is not None:
+            if not self._by_name:
+                return
+            low = text.lower()
+            hits = []
+            for end, key in self._automaton.iter(low):
+                start = end - len(key) + 1
+                if (start == 0 or not _is_word(low[start - 1])) and (end + 1 == len(low) or not _is_word(low[end + 1])):
+                    hits.append((start, -end, key))
+            # same pick as the regex: leftmost, then longest, never overlapping
+            taken_to = -1
+            for start, neg_end, key in sorted(hits):
+                if start > taken_to:
+                    taken_to = -neg_end
+                    yield key
+        elif self._re is not None:
+            for m in self._re.finditer(text):
+                yield m.group().lower()
+
+    def find(self, text: str) -> List[T]:
+        """Values for every name in text, each once, in order of first mention."""
+        found: Dict[T, None] = {}
+        for key in self._names_in(text):
+            for value in self._by_name[key]:
+                found.setdefault(value)
+        return list(found)
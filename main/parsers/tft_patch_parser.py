@@ -1,10 +1,53 @@
 from __future__ import annotations
 
 import re
-from bs4 import BeautifulSoup
+import sys
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
 from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List, Optional, TypedDict
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TypedDict, Union
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # bs4 + html.parser still works, just slower
+    lxml = None
+
+
+# Bump whenever parser output changes for the same HTML; it is part of the
+# cache key for parsed patches (see views.patch_detail).
+PARSER_VERSION = 1
+
+# Only build the DOM for the patch notes, not the whole Riot page
+CONTAINER_STRAINERS = (
+    SoupStrainer(id="patch-notes-container"),
+    SoupStrainer(attrs={"data-testid": "rich-text-html"}),
+)
+# Same lookups for the lxml path, in the same priority order
+CONTAINER_XPATHS = (
+    '//*[@id="patch-notes-container"]',
+    '//*[@data-testid="rich-text-html"]',
+    "//article",
+    "//main",
+)
+# lxml equivalents of the block walker's CSS lookups
+# ("blockquote.blockquote.context", ".context-designers") and of bs4's
+# get_text(), which skips comments and <script>/<style> contents
+INTRO_XPATH = (
+    './/blockquote[contains(concat(" ", normalize-space(@class), " "), " blockquote ")'
+    ' and contains(concat(" ", normalize-space(@class), " "), " context ")]'
+)
+DESIGNERS_XPATH = './/*[contains(concat(" ", normalize-space(@class), " "), " context-designers ")]'
+TEXT_XPATH = ".//text()[not(parent::script or parent::style)]"
+
+if lxml is not None:
+    # Compiled once at import instead of on every .xpath() call
+    _CONTAINER_XPATHS = tuple(etree.XPath(xp) for xp in CONTAINER_XPATHS)
+    _NOTES_CONTAINER_XPATH = _CONTAINER_XPATHS[0]
+    _INTRO_XPATH = etree.XPath(INTRO_XPATH)
+    _DESIGNERS_XPATH = etree.XPath(DESIGNERS_XPATH)
+    _TEXT_XPATH = etree.XPath(TEXT_XPATH, smart_strings=False)
 
 
 # -----------------------------
@@ -22,7 +65,7 @@ class PatchBlock(TypedDict):
     unit_tier: Optional[int]  # extracted from "UNITS: Tier 1" etc
 
 
-@dataclass
+@dataclass(slots=True)
 class Bucket:
     # each of these is a list of "blocks" (strings)
     all: List[str]
@@ -41,13 +84,16 @@ def _mk_buckets() -> Dict[str, Bucket]:
     }
 
 
+# Every line boundary str.splitlines() knows about
+LINE_BREAK_RE = re.compile(r"\r\n|[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+# Whitespace left at the end of a line (once all breaks are "\n")
+TRAILING_WS_RE = re.compile(r"[^\S\n]+(?=\n)")
+
+
 def _clean_text(s: str) -> str:
-    lines = [ln.rstrip() for ln in (s or "").splitlines()]
-    while lines and not lines[0].strip():
-        lines.pop(0)
-    while lines and not lines[-1].strip():
-        lines.pop()
-    return "\n".join(lines).strip()
+    # rstrip every line, then trim the edges (which also drops blank
+    # leading/trailing lines) - as two C-level substitutions
+    return TRAILING_WS_RE.sub("", LINE_BREAK_RE.sub("\n", s or "")).strip()
 
 
 def _render_node_as_text(node) -> str:
@@ -63,36 +109,38 @@ def _major_group_from_h2(title: str) -> str:
     return "all"
 
 
-def _category_from_h4(title: str) -> str:
-    t = (title or "").strip().upper()
-
-    if t.startswith("UNITS:"):
-        return "champions"
-    if t in {"TRAITS"}:
-        return "traits"
-    if t in {"AUGMENTS"}:
-        return "augments"
-
-    if t in {"CORE ITEMS", "RADIANT ITEMS", "ARTIFACTS", "EMBLEMS"}:
-        return "items"
-
+# H4 title (stripped, upper-cased) -> category
+_H4_EXACT = {
+    "TRAITS": "traits",
+    "AUGMENTS": "augments",
+    "CORE ITEMS": "items",
+    "RADIANT ITEMS": "items",
+    "ARTIFACTS": "items",
+    "EMBLEMS": "items",
+}
+_H4_PREFIXES = (("UNITS:", "champions"),)
+
+UNIT_TIER_RE = re.compile(r"\bTIER\s*(\d+)\b")
+
+
+def _category_from_h4(key: str) -> str:
+    # key is the H4 title already .strip().upper()'d by the caller
+    cat = _H4_EXACT.get(key)
+    if cat:
+        return cat
+    for prefix, cat in _H4_PREFIXES:
+        if key.startswith(prefix):
+            return cat
     return "other"
 
 
-def _extract_unit_tier(h4_title: str) -> Optional[int]:
+def _extract_unit_tier(key: str) -> Optional[int]:
     """
-    Extracts tier from strings like:
-      "UNITS: Tier 1" / "UNITS: TIER 2" / "UNITS: Tier 3"
+    Extracts tier from (stripped, upper-cased) H4 titles like:
+      "UNITS: TIER 1" / "UNITS: TIER 2" / "UNITS: TIER 3"
     """
-    if not h4_title:
-        return None
-    m = re.search(r"\bTIER\s*(\d+)\b", h4_title.strip().upper())
-    if not m:
-        return None
-    try:
-        return int(m.group(1))
-    except ValueError:
-        return None
+    m = UNIT_TIER_RE.search(key)
+    return int(m.group(1)) if m else None
 
 
 def _append_bucket_block(
@@ -102,11 +150,11 @@ def _append_bucket_block(
     heading: str,
     body: str,
 ) -> None:
-    body = _clean_text(body)
+    # body is a block's "text", which parse_tft_patch_blocks already cleaned
     if not body:
         return
 
-    block = f"{heading}\n{body}".strip() if heading else body
+    block = heading + "\n" + body if heading else body  # both already clean
     buckets[cat].all.append(block)
     if size == "large":
         buckets[cat].large.append(block)
@@ -117,6 +165,76 @@ def _append_bucket_block(
 # =========================================================
 # NEW: Structured blocks for saving PatchSection rows
 # =========================================================
+# Nodes the block walker cares about, in document order
+BLOCK_TAGS = ("h2", "h4", "blockquote", "ul")
+_BLOCK_TAG_LIST = list(BLOCK_TAGS)  # bs4 find_all() wants a list
+# Every block comes from a <ul>, a <blockquote> or the designers note; HTML
+# with none of them can't yield any, so skip building a DOM for it
+BLOCK_SOURCE_TAG_RE = re.compile(r"<(?i:ul|blockquote)(?![\w-])")  # leading "<" keeps the scan fast
+
+# One walked node: (tag, text) for h2/h4/blockquote, (tag, lines) for ul
+BlockNode = Tuple[str, Union[str, List[str]]]
+
+# Headings and short bullet lines ("Attack Damage", unit names...) repeat
+# across blocks and patches; interned, every copy is one object, and the
+# pickled blocks coming back from parser worker processes store them once.
+INTERN_MAX_LEN = 32
+
+
+def _walk_blocks_bs4(raw_html: str) -> Tuple[List[str], Iterator[BlockNode]]:
+    soup = BeautifulSoup(raw_html, "html.parser")
+    root = soup.select_one("#patch-notes-container") or soup
+
+    # Overview: intro + designers (we store as a single overview block)
+    intro = root.select_one("blockquote.blockquote.context")
+    designers = root.select_one(".context-designers")
+    overview_parts = [_render_node_as_text(n) for n in (intro, designers) if n]
+
+    def nodes() -> Iterator[BlockNode]:
+        for el in root.find_all(_BLOCK_TAG_LIST, recursive=True):
+            if el.name in ("h2", "h4"):
+                yield el.name, _clean_text(el.get_text(" ", strip=True))
+            elif el.name == "ul":
+                yield "ul", [
+                    _clean_text(li.get_text(" ", strip=True))
+                    for li in el.find_all("li", recursive=True)
+                ]
+            # Skip the overview intro blockquote we already handled above
+            elif not (intro and el is intro):
+                yield "blockquote", _render_node_as_text(el)
+
+    return overview_parts, nodes()
+
+
+def _lxml_text(el, sep: str) -> str:
+    # bs4's get_text(sep, strip=True)
+    return sep.join(t for t in (s.strip() for s in _TEXT_XPATH(el)) if t)
+
+
+def _walk_blocks_lxml(raw_html: str) -> Tuple[List[str], Iterator[BlockNode]]:
+    try:
+        doc = lxml.html.document_fromstring(raw_html)
+    except etree.ParserError:  # whitespace-only / empty document
+        return [], iter(())
+    found = _NOTES_CONTAINER_XPATH(doc)
+    root = found[0] if found else doc
+
+    intro = next(iter(_INTRO_XPATH(root)), None)
+    designers = next(iter(_DESIGNERS_XPATH(root)), None)
+    overview_parts = [_clean_text(_lxml_text(n, "\n")) for n in (intro, designers) if n is not None]
+
+    def nodes() -> Iterator[BlockNode]:
+        for el in root.iterdescendants(*BLOCK_TAGS):
+            if el.tag in ("h2", "h4"):
+                yield el.tag, _clean_text(_lxml_text(el, " "))
+            elif el.tag == "ul":
+                yield "ul", [_clean_text(_lxml_text(li, " ")) for li in el.iterdescendants("li")]
+            elif el is not intro:
+                yield "blockquote", _clean_text(_lxml_text(el, "\n"))
+
+    return overview_parts, nodes()
+
+
 def parse_tft_patch_blocks(raw_html: str) -> List[PatchBlock]:
     """
     Returns a list of structured blocks, preserving:
@@ -128,72 +246,66 @@ def parse_tft_patch_blocks(raw_html: str) -> List[PatchBlock]:
 
     This is what you save into PatchSection.
     """
-    if not raw_html:
-        return []
+    return list(_iter_tft_patch_blocks(raw_html))
 
-    soup = BeautifulSoup(raw_html, "html.parser")
-    root = soup.select_one("#patch-notes-container") or soup
 
-    blocks: List[PatchBlock] = []
-    order = 0
+def _iter_tft_patch_blocks(raw_html: str) -> Iterator[PatchBlock]:
+    # parse_tft_patch_blocks as a generator, so parse_tft_patch_html can
+    # bucket blocks as they're found instead of building the list first
+    if not raw_html:
+        return
+    if "context-designers" not in raw_html and not BLOCK_SOURCE_TAG_RE.search(raw_html):
+        return
 
-    # Overview: intro + designers (we store as a single overview block)
-    intro = root.select_one("blockquote.blockquote.context")
-    designers = root.select_one(".context-designers")
+    if lxml is not None:
+        overview_parts, nodes = _walk_blocks_lxml(raw_html)
+    else:
+        overview_parts, nodes = _walk_blocks_bs4(raw_html)
 
-    overview_parts: List[str] = []
-    if intro:
-        overview_parts.append(_render_node_as_text(intro))
-    if designers:
-        overview_parts.append(_render_node_as_text(designers))
+    order = 0
 
     if overview_parts:
-        blocks.append({
+        yield {
             "category": "overview",
             "size": "all",
             "h2": "",
             "h4": "",
             "order": order,
-            "text": _clean_text("\n\n".join(overview_parts)),
+            "text": "\n\n".join(overview_parts).strip(),  # parts are already clean
             "lines": [],
             "unit_tier": None,
-        })
+        }
         order += 1
 
     current_h2 = ""
     current_size = "all"
     current_h4 = ""
+    # category/tier only change with the H4, so work them out once per H4
+    cat = "other"
+    unit_tier = None
 
     # Walk important nodes in order
-    for el in root.find_all(["h2", "h4", "blockquote", "ul"], recursive=True):
-        if el.name == "h2":
-            current_h2 = _clean_text(el.get_text(" ", strip=True))
+    for tag, payload in nodes:
+        if tag == "h2":
+            current_h2 = sys.intern(payload)
             current_size = _major_group_from_h2(current_h2)
             continue
 
-        if el.name == "h4":
-            current_h4 = _clean_text(el.get_text(" ", strip=True))
+        if tag == "h4":
+            current_h4 = sys.intern(payload)
+            h4_key = current_h4.strip().upper()
+            cat = _category_from_h4(h4_key)
+            unit_tier = _extract_unit_tier(h4_key) if cat == "champions" else None
             continue
 
-        # Skip the overview intro blockquote we already handled above
-        if el.name == "blockquote" and intro and el is intro:
-            continue
+        if tag == "ul":
+            lines = [sys.intern(ln) if len(ln) <= INTERN_MAX_LEN else ln for ln in payload if ln]
 
-        cat = _category_from_h4(current_h4) if current_h4 else "other"
-        unit_tier = _extract_unit_tier(current_h4) if cat == "champions" else None
-
-        if el.name == "ul":
-            lines = [
-                _clean_text(li.get_text(" ", strip=True))
-                for li in el.find_all("li", recursive=True)
-            ]
-            lines = [ln for ln in lines if ln]
-
-            text = _clean_text("\n".join(lines))  # readable
+            text = "\n".join(lines)  # readable; each line is already clean
             if not text:
                 continue
 
-            blocks.append({
+            yield {
                 "category": cat,
                 "size": current_size,
                 "h2": current_h2,
@@ -202,16 +314,16 @@ def parse_tft_patch_blocks(raw_html: str) -> List[PatchBlock]:
                 "text": text,
                 "lines": lines,
                 "unit_tier": unit_tier,
-            })
+            }
             order += 1
             continue
 
-        if el.name == "blockquote":
-            text = _render_node_as_text(el)
+        if tag == "blockquote":
+            text = payload
             if not text:
                 continue
 
-            blocks.append({
+            yield {
                 "category": cat,
                 "size": current_size,
                 "h2": current_h2,
@@ -220,12 +332,10 @@ def parse_tft_patch_blocks(raw_html: str) -> List[PatchBlock]:
                 "text": text,
                 "lines": [],
                 "unit_tier": unit_tier,
-            })
+            }
             order += 1
             continue
 
-    return blocks
-
 
 # =========================================================
 # OLD: Keep your existing dict output for templates
@@ -235,10 +345,18 @@ def parse_tft_patch_html(raw_html: str) -> OrderedDict:
     Backwards compatible output for your templates:
       out["items"]["large"] = "...string..."
     """
-    blocks = parse_tft_patch_blocks(raw_html)
-    if not blocks:
+    blocks = _iter_tft_patch_blocks(raw_html)
+    first = next(blocks, None)
+    if first is None:
         return OrderedDict()
+    return tft_sections_from_blocks(chain((first,), blocks))
+
 
+def tft_sections_from_blocks(blocks: Iterable[Mapping[str, Any]]) -> OrderedDict:
+    """
+    The parse_tft_patch_html dict built from already-parsed blocks, e.g. a
+    patch's stored PatchSection rows, so views don't re-parse raw_html.
+    """
     buckets = _mk_buckets()
 
     for b in blocks:
@@ -250,10 +368,13 @@ def parse_tft_patch_html(raw_html: str) -> OrderedDict:
     out = OrderedDict()
     for key in ["overview", "champions", "items", "traits", "augments", "other"]:
         bk = buckets[key]
+        all_text = "\n\n".join(bk.all)
+        # large/small are subsequences of all; when one of them holds every
+        # block (a category that only appears under one H2) reuse the string
         out[key] = {
-            "all": _clean_text("\n\n".join(bk.all)),
-            "large": _clean_text("\n\n".join(bk.large)),
-            "small": _clean_text("\n\n".join(bk.small)),
+            "all": all_text,
+            "large": all_text if len(bk.large) == len(bk.all) else "\n\n".join(bk.large),
+            "small": all_text if len(bk.small) == len(bk.all) else "\n\n".join(bk.small),
         }
     return out
 
@@ -274,3 +395,87 @@ def parse_tft_patch(raw_text: str = "", raw_html: Optional[str] = None) -> Order
         ])
 
     return OrderedDict()
+
+
+# =========================================================
+# Full Riot page -> (raw_html, raw_text, blocks)
+# =========================================================
+def _make_soup(
+    html: Union[str, bytes],
+    parse_only: Optional[SoupStrainer] = None,
+    from_encoding: Optional[str] = None,
+) -> BeautifulSoup:
+    # lxml is much faster on the big patch pages; fall back if it isn't installed
+    kwargs = {"parse_only": parse_only}
+    if isinstance(html, bytes):
+        kwargs["from_encoding"] = from_encoding
+    try:
+        return BeautifulSoup(html, "lxml", **kwargs)
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser", **kwargs)
+
+
+def _extract_patch_container(html: Union[str, bytes], encoding: Optional[str] = None):
+    for strainer in CONTAINER_STRAINERS:
+        soup = _make_soup(html, parse_only=strainer, from_encoding=encoding)
+        container = soup.find(True)
+        if container:
+            return soup, container
+
+    # cold path: no known container, parse the full page for the fallback
+    return _make_soup(html, from_encoding=encoding), None
+
+
+def _extract_patch_page_lxml(html: Union[str, bytes], encoding: Optional[str] = None) -> Tuple[str, str]:
+    """
+    (raw_html, raw_text) straight from lxml: the text comes from the C-level
+    itertext() walk instead of bs4's Python tree walk.
+    """
+    parser = None
+    if isinstance(html, bytes) and encoding:
+        parser = lxml.html.HTMLParser(encoding=encoding)
+    doc = lxml.html.document_fromstring(html, parser=parser)
+    for xp in _CONTAINER_XPATHS:
+        found = xp(doc)
+        if found:
+            el = found[0]
+            break
+    else:
+        return "", ""
+
+    # raw_html is the container as-is (scripts/styles included, like the bs4
+    # path); raw_text skips their contents, which bs4's get_text() never included
+    raw_html = lxml.html.tostring(el, encoding="unicode", with_tail=False)
+    raw_text = "\n".join(t for t in (part.strip() for part in _TEXT_XPATH(el)) if t)
+    return raw_html, raw_text
+
+
+def parse_tft_patch_page(
+    html: Union[str, bytes],
+    encoding: Optional[str] = None,
+) -> Tuple[str, str, List[PatchBlock]]:
+    """
+    Pure function over a whole patch-notes page (no Django), so
+    fetch_tft_patches can run it in worker processes.
+
+    `html` may be the undecoded response body; the parser then decodes it
+    in C using `encoding` (or the page's <meta charset> if None).
+
+    Returns (raw_html, raw_text, blocks) for the notes container, falling
+    back to <article>/<main> when Riot's container markup is missing.
+    """
+    if lxml is not None:
+        raw_html, raw_text = _extract_patch_page_lxml(html, encoding)
+    else:
+        soup, container = _extract_patch_container(html, encoding)
+        if not container:
+            container = soup.find("article") or soup.find("main")
+        if not container:
+            return "", "", []
+
+        raw_html = str(container)
+        raw_text = container.get_text("\n", strip=True)
+
+    if not raw_html:
+        return "", "", []
+    return raw_html, raw_text, parse_tft_patch_blocks(raw_html)
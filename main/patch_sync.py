@@ -0,0 +1,160 @@
+"""
+Shared PatchSection/EntityChange plumbing for the TFT patch commands
+(fetch_tft_patches and reparse_tft_patches): diffing parsed blocks against
+the stored sections, and rebuilding the entity links from those sections.
+"""
+from __future__ import annotations
+
+from typing import Iterator
+
+from django.contrib.contenttypes.models import ContentType
+
+from .models import Augment, Champion, EntityChange, Game, Item, Patch, PatchSection, Trait
+from .parsers.entity_matcher import EntityMatcher
+
+
+# ~500 rows x 10 columns per INSERT stays well under SQLite/Postgres param limits
+SECTION_BATCH_SIZE = 500
+
+
+def _section_keys(rows, heading) -> Iterator[tuple]:
+    # (category, size, h2, h4, n): the n-th block under that heading. Unlike
+    # the document-wide order, this doesn't shift when a block is inserted
+    # elsewhere in the page, so the rows after it are matched, not re-created.
+    seen: dict[tuple, int] = {}
+    for row in rows:
+        head = heading(row)
+        n = seen[head] = seen.get(head, -1) + 1
+        yield (*head, n)
+
+
+def sync_sections(blocks_by_patch: dict[Patch, list]) -> dict[int, tuple[int, int, int]]:
+    """
+    Diff parsed blocks against the stored PatchSection rows of every patch in
+    the run and only write what changed: one SELECT, then one bulk_create, one
+    bulk_update and one delete shared by all patches.
+    Returns {patch.pk: (inserted, updated, deleted)}.
+    """
+    stored_by_patch: dict[int, list[PatchSection]] = {p.pk: [] for p in blocks_by_patch}
+    for s in PatchSection.objects.filter(patch__in=list(blocks_by_patch)).only(
+        "id", "patch_id", "category", "size", "h2", "h4", "order", "text", "lines_json", "unit_tier"
+    ).order_by("order", "id"):
+        stored_by_patch[s.patch_id].append(s)
+
+    to_insert: list[PatchSection] = []
+    to_update: list[PatchSection] = []
+    to_delete: list[int] = []
+    stats: dict[int, tuple[int, int, int]] = {}
+
+    for patch, blocks in blocks_by_patch.items():
+        rows = stored_by_patch[patch.pk]
+        stored = dict(zip(_section_keys(rows, lambda s: (s.category, s.size, s.h2, s.h4)), rows))
+        block_keys = _section_keys(blocks, lambda b: (b["category"], b["size"], b["h2"], b["h4"]))
+        ins = upd = 0
+        for key, b in zip(block_keys, blocks):
+            sec = stored.pop(key, None)
+            if sec is None:
+                to_insert.append(
+                    PatchSection(
+                        patch=patch,
+                        game_id=patch.game_id,
+                        set_key=patch.version_major,
+                        category=b["category"],
+                        size=b["size"],
+                        h2=b["h2"],
+                        h4=b["h4"],
+                        order=b["order"],
+                        text=b["text"],
+                        lines_json=b["lines"],
+                        unit_tier=b["unit_tier"],
+                    )
+                )
+                ins += 1
+            elif (sec.order, sec.text, sec.lines_json, sec.unit_tier) != (
+                b["order"], b["text"], b["lines"], b["unit_tier"]
+            ):
+                sec.order = b["order"]
+                sec.text = b["text"]
+                sec.lines_json = b["lines"]
+                sec.unit_tier = b["unit_tier"]
+                to_update.append(sec)
+                upd += 1
+
+        # whatever is left in `stored` no longer appears in the patch
+        to_delete.extend(s.id for s in stored.values())
+        stats[patch.pk] = (ins, upd, len(stored))
+
+    if to_delete:
+        PatchSection.objects.filter(id__in=to_delete).delete()
+    if to_insert:
+        PatchSection.objects.bulk_create(to_insert, batch_size=SECTION_BATCH_SIZE)
+    if to_update:
+        PatchSection.objects.bulk_update(
+            to_update, ["order", "text", "lines_json", "unit_tier"], batch_size=SECTION_BATCH_SIZE
+        )
+
+    return stats
+
+
+ENTITY_MODELS = (("champion", Champion), ("item", Item), ("trait", Trait), ("augment", Augment))
+
+
+def entity_matcher(game: Game, set_key: int) -> EntityMatcher:
+    # items with set_key 0 are the core items every set shares
+    names = []
+    for entity_type, model in ENTITY_MODELS:
+        sets = (0, set_key) if model is Item else (set_key,)
+        for pk, name, entity_set in model.objects.filter(game=game, set_key__in=sets).values_list(
+            "id", "name", "set_key"
+        ):
+            names.append((name, (entity_type, pk, entity_set)))
+    return EntityMatcher(names)
+
+
+def sync_entity_changes(game: Game, patches: list[Patch]) -> dict[int, int]:
+    """
+    Rebuild the EntityChange rows of the given patches from their stored
+    sections: every champion/item/trait/augment named in a section's lines
+    gets one row, with those lines as the snippet. Returns {patch.pk: rows}.
+    """
+    content_types = {t: ContentType.objects.get_for_model(m) for t, m in ENTITY_MODELS}
+    set_keys = {p.pk: p.version_major for p in patches}
+    matchers: dict[int, EntityMatcher] = {}
+
+    changes: list[EntityChange] = []
+    counts = {p.pk: 0 for p in patches}
+    sections = (
+        PatchSection.objects.filter(patch__in=patches)
+        .exclude(category="overview")
+        .only("id", "patch_id", "size", "text", "lines_json")
+    )
+    for sec in sections:
+        set_key = set_keys[sec.patch_id]
+        if set_key not in matchers:
+            matchers[set_key] = entity_matcher(game, set_key)
+
+        lines_by_entity: dict[tuple[str, int, int], list[str]] = {}
+        for line in sec.lines_json or [sec.text]:
+            for entity in matchers[set_key].find(line):
+                lines_by_entity.setdefault(entity, []).append(line)
+
+        for (entity_type, pk, entity_set), lines in lines_by_entity.items():
+            content_type = content_types[entity_type]
+            changes.append(
+                EntityChange(
+                    patch_id=sec.patch_id,
+                    section_id=sec.id,
+                    game=game,
+                    set_key=entity_set,
+                    entity_type=content_type.model,
+                    content_type=content_type,
+                    object_id=pk,
+                    snippet="\n".join(lines),
+                    size=sec.size,
+                )
+            )
+            counts[sec.patch_id] += 1
+
+    EntityChange.objects.filter(patch__in=patches).delete()
+    EntityChange.objects.bulk_create(changes, batch_size=SECTION_BATCH_SIZE)
+    return counts
@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .context_processors import NAVBAR_GAMES_CACHE_KEY, clear_games_by_slug
+from .models import Feedback, FeedbackTally, Game
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+def clear_game_caches(sender, **kwargs):
+    cache.delete(NAVBAR_GAMES_CACHE_KEY)
+    clear_games_by_slug()
+
+
+# ---------------------------------------------------------
+# FeedbackTally roll-up
+# ---------------------------------------------------------
+
+def _tally_key(fb):
+    return (fb.patch_id, fb.content_type_id, fb.object_id, fb.vote)
+
+
+def _bump_tally(key, entity_type, delta):
+    patch_id, content_type_id, object_id, vote = key
+    rows = FeedbackTally.objects.filter(
+        patch_id=patch_id, content_type_id=content_type_id, object_id=object_id, vote=vote
+    )
+    # F() expression so concurrent votes can't lose an increment
+    updated = rows.update(count=F("count") + delta)
+    if delta < 0:
+        rows.filter(count=0).delete()
+        return
+    if updated:
+        return
+
+    try:
+        with transaction.atomic():
+            rows.create(
+                patch_id=patch_id, content_type_id=content_type_id, object_id=object_id,
+                vote=vote, entity_type=entity_type, count=delta,
+            )
+    except IntegrityError:
+        # another request created the row between our UPDATE and INSERT
+        rows.update(count=F("count") + delta)
+
+
+@receiver(pre_save, sender=Feedback)
+def remember_feedback_tally_key(sender, instance, raw=False, **kwargs):
+    # An edit may move a vote between tallies; note where it was counted before.
+    instance._tally_key_before = None
+    if instance.pk and not raw:
+        old = Feedback.objects.filter(pk=instance.pk).values_list(
+            "patch_id", "content_type_id", "object_id", "vote", "entity_type"
+        ).first()
+        if old:
+            instance._tally_key_before = (old[:4], old[4])
+
+
+@receiver(post_save, sender=Feedback)
+def count_feedback(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, "_tally_key_before", None)
+    key = _tally_key(instance)
+    if before and before[0] == key:
+        return
+    if before:
+        _bump_tally(before[0], before[1], -1)
+    _bump_tally(key, instance.entity_type, 1)
+
+
+@receiver(post_delete, sender=Feedback)
+def uncount_feedback(sender, instance, **kwargs):
+    _bump_tally(_tally_key(instance), instance.entity_type, -1)
@@ -1,3 +1,790 @@
-from django.test import TestCase
+import copy
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipIf
 
-# Create your tests here.
+import requests
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from . import context_processors, fields, views
+from .management.commands.seed_tft_catalog import SeedRun, _champion_row
+from .models import Augment, Champion, EntityChange, Feedback, FeedbackTally, Game, Item, Patch, PatchSection, Trait
+from .parsers import entity_matcher, tft_patch_parser
+from .parsers.entity_matcher import EntityMatcher
+from .parsers.tft_patch_parser import parse_tft_patch_page
+from .patch_sync import sync_entity_changes, sync_sections
+
+TESTDATA = Path(__file__).resolve().parent / "testdata"
+
+
+class DenormalisedGameSetTests(TestCase):
+    """game/set_key copies on EntityChange, Feedback and PatchSection."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tft = Game.objects.create(name="TFT", slug="tft")
+        cls.other = Game.objects.create(name="Other", slug="other")
+        cls.patch = Patch.objects.create(game=cls.tft, version="16.4")
+        cls.other_patch = Patch.objects.create(game=cls.other, version="1.0")
+        cls.trait = Trait.objects.create(game=cls.tft, set_key=16, name="Bruiser", slug="bruiser")
+        cls.item = Item.objects.create(game=cls.tft, set_key=0, name="Sword", slug="sword")
+
+    def test_entity_change_moved_to_other_entity_and_patch(self):
+        section = PatchSection.objects.create(patch=self.patch, category="traits")
+        change = EntityChange.objects.create(
+            patch=self.patch, section=section, entity_type="trait", entity=self.trait, snippet="x"
+        )
+        self.assertEqual((change.game_id, change.set_key), (self.tft.pk, 16))
+
+        change.entity_type = "item"
+        change.entity = self.item
+        change.save()
+        change.refresh_from_db()
+        self.assertEqual(change.set_key, 0)
+
+        change.patch = self.other_patch
+        change.save()
+        change.refresh_from_db()
+        self.assertEqual(change.game_id, self.other.pk)
+
+    def test_feedback_moved_to_other_entity(self):
+        fb = Feedback.objects.create(patch=self.patch, entity_type="trait", entity=self.trait, vote=Feedback.BUFF)
+        self.assertEqual(fb.set_key, 16)
+
+        fb.entity_type = "item"
+        fb.entity = self.item
+        fb.save()
+        fb.refresh_from_db()
+        self.assertEqual(fb.set_key, 0)
+
+    def test_section_moved_to_other_patch(self):
+        section = PatchSection.objects.create(patch=self.patch, category="traits")
+        self.assertEqual((section.game_id, section.set_key), (self.tft.pk, 16))
+
+        section.patch = self.other_patch
+        section.save()
+        section.refresh_from_db()
+        self.assertEqual((section.game_id, section.set_key), (self.other.pk, 1))
+
+    def test_entity_type_follows_content_type(self):
+        fb = Feedback.objects.create(patch=self.patch, entity_type="champion", entity=self.trait, vote=Feedback.BUFF)
+        self.assertEqual(fb.entity_type, "trait")
+        fb.entity = self.item
+        fb.save()
+        self.assertEqual(Feedback.objects.get().entity_type, "item")
+
+    def test_clean_checks_the_entity(self):
+        fb = Feedback(patch=self.patch, entity=self.trait, vote=Feedback.BUFF)
+        fb.full_clean()
+        self.assertEqual(fb.entity_type, "trait")
+
+        fb.object_id = self.trait.pk + 1000
+        with self.assertRaisesMessage(ValidationError, "No trait with id"):
+            fb.full_clean()
+
+        fb.entity = self.patch
+        with self.assertRaisesMessage(ValidationError, "is not a champion, item, trait or augment"):
+            fb.full_clean()
+
+    def test_unchanged_keys_cost_no_extra_queries(self):
+        section = PatchSection.objects.create(patch=self.patch, category="traits")
+        EntityChange.objects.create(
+            patch=self.patch, section=section, entity_type="trait", entity=self.trait, snippet="x"
+        )
+
+        change = EntityChange.objects.get()
+        change.snippet = "y"
+        with self.assertNumQueries(1):  # just the UPDATE, no patch/entity lookups
+            change.save()
+
+        section = PatchSection.objects.get()
+        section.text = "z"
+        with self.assertNumQueries(1):
+            section.save()
+
+
+class FeedbackTallyTests(TestCase):
+    """FeedbackTally kept in step with Feedback by main/signals.py."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(name="TFT", slug="tft")
+        cls.patch = Patch.objects.create(game=cls.game, version="16.4")
+        cls.next_patch = Patch.objects.create(game=cls.game, version="16.5")
+        cls.trait = Trait.objects.create(game=cls.game, set_key=16, name="Bruiser", slug="bruiser")
+        cls.item = Item.objects.create(game=cls.game, set_key=0, name="Sword", slug="sword")
+
+    def vote(self, entity, vote, patch=None):
+        return Feedback.objects.create(
+            patch=patch or self.patch, entity_type=entity._meta.model_name, entity=entity, vote=vote
+        )
+
+    def assertTalliesMatchRecount(self):
+        key = ("patch_id", "entity_type", "content_type_id", "object_id", "vote")
+        recount = {
+            tuple(row[k] for k in key): row["n"]
+            for row in Feedback.objects.values(*key).annotate(n=Count("id"))
+        }
+        tallies = {
+            tuple(row[k] for k in key): row["count"]
+            for row in FeedbackTally.objects.values(*key, "count")
+        }
+        self.assertEqual(tallies, recount)
+
+    def test_create(self):
+        self.vote(self.trait, Feedback.BUFF)
+        self.vote(self.trait, Feedback.BUFF)
+        self.vote(self.trait, Feedback.NERF)
+        self.vote(self.item, Feedback.FINE)
+        self.assertTalliesMatchRecount()
+        self.assertEqual(FeedbackTally.objects.get(object_id=self.trait.pk, vote=Feedback.BUFF).count, 2)
+
+    def test_revote(self):
+        fb = self.vote(self.trait, Feedback.BUFF)
+        self.vote(self.trait, Feedback.BUFF)
+        fb.vote = Feedback.NERF
+        fb.save()
+        self.assertTalliesMatchRecount()
+
+        # saving without a change must not count the vote twice
+        fb.save()
+        self.assertTalliesMatchRecount()
+
+    def test_move_to_other_entity_and_patch(self):
+        fb = self.vote(self.trait, Feedback.BUFF)
+        fb.entity_type = "item"
+        fb.entity = self.item
+        fb.save()
+        self.assertTalliesMatchRecount()
+
+        fb.patch = self.next_patch
+        fb.save()
+        self.assertTalliesMatchRecount()
+        self.assertFalse(FeedbackTally.objects.filter(patch=self.patch).exists())
+
+    def test_delete(self):
+        fb = self.vote(self.trait, Feedback.BUFF)
+        self.vote(self.trait, Feedback.BUFF)
+        fb.delete()
+        self.assertTalliesMatchRecount()
+
+        Feedback.objects.get().delete()
+        self.assertTalliesMatchRecount()
+        self.assertFalse(FeedbackTally.objects.exists())
+
+
+class GameContextProcessorTests(TestCase):
+    """navbar_games/current_game caches and their invalidation by the Game signals."""
+
+    def setUp(self):
+        cache.clear()
+        context_processors.clear_games_by_slug()
+        self.tft = Game.objects.create(name="TFT", slug="tft", sort_order=1)
+        self.request = RequestFactory().get("/games/tft/")
+
+    def test_navbar_games_cached(self):
+        with self.assertNumQueries(1):
+            ctx = context_processors.navbar_games(self.request)
+        self.assertEqual([g.slug for g in ctx["navbar_games"]], ["tft"])
+        self.assertEqual(ctx["active_game_slug"], "tft")
+        with self.assertNumQueries(0):
+            context_processors.navbar_games(self.request)
+
+    def test_current_game_cached_per_time_bucket(self):
+        with mock.patch.object(context_processors.time, "monotonic", return_value=1000.0):
+            with self.assertNumQueries(1):
+                self.assertEqual(context_processors.current_game(self.request)["current_game"].name, "TFT")
+            with self.assertNumQueries(0):
+                context_processors.current_game(self.request)
+                ctx = context_processors.current_game(RequestFactory().get("/games/nope/"))
+            self.assertIsNone(ctx["current_game"])
+
+        # next bucket: loaded again
+        later = 1000.0 + context_processors.GAMES_BY_SLUG_TTL
+        with mock.patch.object(context_processors.time, "monotonic", return_value=later):
+            with self.assertNumQueries(1):
+                context_processors.current_game(self.request)
+
+    def test_game_save_and_delete_seen_on_next_request(self):
+        url = reverse("game_detail", args=["tft"])
+        response = self.client.get(url)
+        self.assertEqual(response.context["current_game"].name, "TFT")
+        self.assertEqual([g.slug for g in response.context["navbar_games"]], ["tft"])
+
+        self.tft.name = "Teamfight Tactics"
+        self.tft.save()
+        other = Game.objects.create(name="Other", slug="other", sort_order=2)
+        response = self.client.get(url)
+        self.assertEqual(response.context["current_game"].name, "Teamfight Tactics")
+        self.assertEqual([g.slug for g in response.context["navbar_games"]], ["tft", "other"])
+
+        other.delete()
+        response = self.client.get(url)
+        self.assertEqual([g.slug for g in response.context["navbar_games"]], ["tft"])
+
+
+class EntityMatcherTests(SimpleTestCase):
+    NAMES = [
+        ("Jarvan", "jarvan"),
+        ("Jarvan IV", "jarvan-iv"),
+        ("Vi", "vi"),
+        ("Kai'Sa", "kaisa"),
+        ("Infinity Edge", "ie"),
+        ("Edge", "edge"),
+    ]
+    TEXTS = [
+        "Jarvan IV: HP 600 => 650",
+        "Jarvan: HP 600 => 650",
+        "jarvan iv and JARVAN",
+        "Vi, Viego and Vi_x; (Vi)",
+        "Kai'Sa mana reduced",
+        "Infinity Edge crit 20% => 25%; Edge of Night unchanged",
+        "Jarvan IVb",
+        "",
+    ]
+
+    def matcher(self, use_automaton: bool):
+        if use_automaton:
+            return EntityMatcher(self.NAMES)
+        with mock.patch.object(entity_matcher, "ahocorasick", None):
+            return EntityMatcher(self.NAMES)
+
+    def assertFinds(self, text, expected):
+        for use_automaton in (False, True) if entity_matcher.ahocorasick else (False,):
+            with self.subTest(text=text, automaton=use_automaton):
+                self.assertEqual(self.matcher(use_automaton).find(text), expected)
+
+    def test_longest_name_wins(self):
+        self.assertFinds("Jarvan IV: HP 600 => 650", ["jarvan-iv"])
+        self.assertFinds("Jarvan: HP 600 => 650", ["jarvan"])
+        self.assertFinds("Infinity Edge crit up", ["ie"])
+
+    def test_whole_words_only(self):
+        self.assertFinds("Viego and Vi_x", [])
+        self.assertFinds("Vi, (Vi) and Viego", ["vi"])
+        self.assertFinds("Jarvan IVb", ["jarvan"])
+        self.assertFinds("Kai'Sa mana reduced", ["kaisa"])
+
+    def test_case_insensitive_and_unique(self):
+        self.assertFinds("jarvan iv and JARVAN, then Jarvan IV again", ["jarvan-iv", "jarvan"])
+
+    def test_short_and_duplicate_names(self):
+        matcher = EntityMatcher([("A", 1), ("Ahri", 2), ("ahri", 3)])
+        self.assertEqual(matcher.find("A buff for Ahri"), [2, 3])
+        self.assertEqual(EntityMatcher([]).find("anything"), [])
+
+    @skipIf(entity_matcher.ahocorasick is None, "pyahocorasick not installed")
+    def test_backends_agree(self):
+        with_automaton, with_regex = self.matcher(True), self.matcher(False)
+        self.assertIsNotNone(with_automaton._automaton)
+        self.assertIsNone(with_regex._automaton)
+        for text in self.TEXTS:
+            with self.subTest(text=text):
+                self.assertEqual(with_automaton.find(text), with_regex.find(text))
+
+
+class CompressedTextFieldTests(TestCase):
+    """Round trips through Patch.raw_text/raw_html (CompressedTextField)."""
+
+    TEXT = "Patch 16.4 — Kai'Sa: AD 50 ⇒ 55 ✨ 日本語\n" * 50
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(name="TFT", slug="tft")
+
+    def stored_bytes(self, patch, column="raw_text"):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {column} FROM main_patch WHERE id = %s", [patch.pk])
+            return bytes(cursor.fetchone()[0])
+
+    def roundtrip(self, **values):
+        patch = Patch.objects.create(game=self.game, version="16.4", **values)
+        return patch, Patch.objects.get(pk=patch.pk)
+
+    @skipIf(fields.zstandard is None, "zstandard not installed")
+    def test_zstd(self):
+        patch, loaded = self.roundtrip(raw_text=self.TEXT)
+        self.assertEqual(self.stored_bytes(patch)[:1], b"Z")
+        self.assertEqual(loaded.raw_text, self.TEXT)
+
+    def test_zlib(self):
+        with mock.patch.object(fields, "zstandard", None):
+            patch, loaded = self.roundtrip(raw_text=self.TEXT)
+        self.assertEqual(self.stored_bytes(patch)[:1], b"D")
+        self.assertLess(len(self.stored_bytes(patch)), len(self.TEXT.encode()))
+        self.assertEqual(loaded.raw_text, self.TEXT)
+
+    def test_zlib_rows_readable_without_zstandard(self):
+        with mock.patch.object(fields, "zstandard", None):
+            patch, _ = self.roundtrip(raw_text=self.TEXT)
+            self.assertEqual(Patch.objects.get(pk=patch.pk).raw_text, self.TEXT)
+
+    def test_empty_blob_reads_as_empty_text(self):
+        patch, _ = self.roundtrip(raw_text=self.TEXT)
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE main_patch SET raw_text = %s WHERE id = %s", [b"", patch.pk])
+        self.assertEqual(Patch.objects.get(pk=patch.pk).raw_text, "")
+        self.assertEqual(Patch._meta.get_field("raw_text").to_python(b""), "")
+
+    @skipIf(fields.zstandard is None, "zstandard not installed")
+    def test_zstd_rows_without_zstandard_fail_loudly(self):
+        patch, _ = self.roundtrip(raw_text=self.TEXT)
+        with mock.patch.object(fields, "zstandard", None), self.assertRaises(RuntimeError):
+            Patch.objects.get(pk=patch.pk)
+
+    def test_empty_and_none(self):
+        patch, loaded = self.roundtrip(raw_text="", raw_html=None)
+        self.assertEqual(loaded.raw_text, "")
+        self.assertIsNone(loaded.raw_html)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT raw_html FROM main_patch WHERE id = %s", [patch.pk])
+            self.assertIsNone(cursor.fetchone()[0])
+
+        # a bare Patch() defaults to "" like the TextField it replaced
+        self.assertEqual(Patch().raw_text, "")
+
+    def test_update_roundtrip(self):
+        patch, _ = self.roundtrip(raw_html="<p>old</p>")
+        Patch.objects.filter(pk=patch.pk).update(raw_html="<p>nytt ✓</p>")
+        self.assertEqual(Patch.objects.get(pk=patch.pk).raw_html, "<p>nytt ✓</p>")
+
+    def test_unknown_tag(self):
+        with self.assertRaises(ValueError):
+            fields.decompress_text(b"Xgarbage")
+
+
+class SyncSectionsTests(TestCase):
+    """sync_sections() only writes the PatchSection rows that changed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(name="TFT", slug="tft")
+
+    def blocks(self, name):
+        html = (TESTDATA / name).read_bytes()
+        _, _, blocks = parse_tft_patch_page(html, encoding="utf-8")
+        self.assertTrue(blocks)
+        return blocks
+
+    def test_refetch_writes_only_the_diff(self):
+        patch = Patch.objects.create(game=self.game, version="16.4")
+        first = self.blocks("tft_patch_16_4.html")
+
+        self.assertEqual(sync_sections({patch: first}), {patch.pk: (len(first), 0, 0)})
+        self.assertEqual(sync_sections({patch: first}), {patch.pk: (0, 0, 0)})
+
+        # one line changed (Ahri), one list added at the end
+        refetched = self.blocks("tft_patch_16_4_refetched.html")
+        self.assertEqual(sync_sections({patch: refetched}), {patch.pk: (1, 1, 0)})
+        self.assertEqual(patch.sections.count(), len(refetched))
+        self.assertTrue(patch.sections.filter(text__contains="Ahri: AD 50 ⇒ 60").exists())
+        self.assertTrue(patch.sections.filter(text="Fixed Jinx rockets missing their target.").exists())
+
+        # and back: the added list goes away, the changed line is restored
+        self.assertEqual(sync_sections({patch: first}), {patch.pk: (0, 1, 1)})
+        self.assertEqual(
+            list(patch.sections.order_by("order").values_list("text", flat=True)),
+            [b["text"] for b in first],
+        )
+
+    def test_block_inserted_mid_list(self):
+        patch = Patch.objects.create(game=self.game, version="16.4")
+        html = (TESTDATA / "tft_patch_16_4.html").read_text(encoding="utf-8")
+        sync_sections({patch: self.blocks("tft_patch_16_4.html")})
+        ids = dict(patch.sections.values_list("text", "id"))
+
+        html = html.replace(
+            "<h4>UNITS: TIER 3</h4>", "<h4>Portals</h4><ul><li>Portal A changed</li></ul><h4>UNITS: TIER 3</h4>", 1
+        )
+        blocks, = parse_tft_patch_page(html.encode(), encoding="utf-8")[2:]
+        new = next(i for i, b in enumerate(blocks) if b["h4"] == "Portals")
+        # one insert; the blocks after it only move down, nothing is re-created
+        self.assertEqual(sync_sections({patch: blocks}), {patch.pk: (1, len(blocks) - new - 1, 0)})
+        self.assertEqual(
+            list(patch.sections.order_by("order").values_list("text", flat=True)),
+            [b["text"] for b in blocks],
+        )
+        for text, pk in ids.items():
+            self.assertEqual(patch.sections.get(text=text).pk, pk)
+
+    def test_patches_synced_together(self):
+        a = Patch.objects.create(game=self.game, version="16.3")
+        b = Patch.objects.create(game=self.game, version="16.4")
+        blocks = self.blocks("tft_patch_16_4.html")
+        sync_sections({a: blocks})
+
+        stats = sync_sections({a: self.blocks("tft_patch_16_4_refetched.html"), b: blocks})
+        self.assertEqual(stats, {a.pk: (1, 1, 0), b.pk: (len(blocks), 0, 0)})
+        self.assertEqual(set(PatchSection.objects.values_list("game_id", flat=True)), {self.game.pk})
+
+
+class SyncEntityChangesTests(TestCase):
+    """sync_entity_changes() links the entities named in a patch's sections."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(name="TFT", slug="tft")
+        cls.patch = Patch.objects.create(game=cls.game, version="16.4")
+        cls.ahri = Champion.objects.create(game=cls.game, set_key=16, name="Ahri", slug="ahri", cost=1)
+        cls.bruiser = Trait.objects.create(game=cls.game, set_key=16, name="Bruiser", slug="bruiser")
+        cls.bt = Item.objects.create(game=cls.game, set_key=0, name="Bloodthirster", slug="bloodthirster")
+        # same name, other set: must not be matched in a set 16 patch
+        Champion.objects.create(game=cls.game, set_key=15, name="Jinx", slug="jinx", cost=3)
+        html = (TESTDATA / "tft_patch_16_4.html").read_bytes()
+        sync_sections({cls.patch: parse_tft_patch_page(html, encoding="utf-8")[2]})
+
+    def rows(self):
+        return sorted(
+            EntityChange.objects.values_list(
+                "entity_type", "content_type_id", "object_id", "game_id", "set_key", "patch_id", "snippet"
+            )
+        )
+
+    def test_rows_carry_entity_keys(self):
+        self.assertEqual(sync_entity_changes(self.game, [self.patch]), {self.patch.pk: 3})
+
+        ct = ContentType.objects.get_for_model
+        self.assertEqual(
+            self.rows(),
+            sorted(
+                (e._meta.model_name, ct(e).pk, e.pk, self.game.pk, e.set_key, self.patch.pk, snippet)
+                for e, snippet in [
+                    (self.ahri, "Ahri: AD 50 ⇒ 55"),
+                    (self.bruiser, "Bruiser: HP 10% ⇒ 12%"),
+                    (self.bt, "Bloodthirster: Omnivamp 20% ⇒ 22%"),
+                ]
+            ),
+        )
+        for change in EntityChange.objects.all():
+            self.assertEqual(change.entity.set_key, change.set_key)
+
+    def test_rerun_is_idempotent(self):
+        sync_entity_changes(self.game, [self.patch])
+        first = self.rows()
+        self.assertEqual(sync_entity_changes(self.game, [self.patch]), {self.patch.pk: 3})
+        self.assertEqual(self.rows(), first)
+
+
+DD_DATA = {
+    "champion": {
+        "Maps/Shipping/Map22/Sets/TFTSet16/Shop/TFT16_KaiSa": {
+            "id": "TFT16_KaiSa", "name": "Kai'Sa", "cost": 3, "image": {"full": "TFT16_KaiSa.TFT_Set16.png"},
+        },
+    },
+    "trait": {
+        "TFT16_Bruiser": {"id": "TFT16_Bruiser", "name": "Bruiser", "image": {"full": "Bruiser.TFT_Set16.png"}},
+    },
+    "item": {
+        "TFT_Item_InfinityEdge": {
+            "id": "TFT_Item_InfinityEdge", "name": "Infinity Edge", "image": {"full": "TFT_Item_InfinityEdge.png"},
+        },
+    },
+    "augment": {
+        "TFT16_Augment_Hedge": {
+            "id": "TFT16_Augment_Hedge", "name": "Hedge Fund", "image": {"full": "Hedge.TFT_Set16.png"},
+        },
+    },
+}
+
+
+class SeedTftDdragonTests(TestCase):
+    """seed_tft_ddragon through main.ddragon.upsert_entries, without the network."""
+
+    def seed(self, data, *args):
+        out = StringIO()
+        with mock.patch("main.management.commands.seed_tft_ddragon.fetch_dd_data", return_value=data):
+            call_command("seed_tft_ddragon", "--ddragon", "16.1.1", *args, stdout=out)
+        return out.getvalue()
+
+    def rows(self):
+        return {
+            model: sorted(model.objects.values_list("set_key", "slug", "name", "image_url"))
+            for model in (Champion, Trait, Item, Augment)
+        }
+
+    def test_seed_twice_then_update(self):
+        out = self.seed(DD_DATA)
+        self.assertEqual(out.count("added=1, updated=0, skipped=0"), 4)
+        champion = Champion.objects.get()
+        self.assertEqual((champion.set_key, champion.slug, champion.cost), (16, "kaisa", 3))
+        self.assertEqual(Item.objects.get().set_key, 0)
+
+        out = self.seed(DD_DATA)
+        self.assertEqual(out.count("added=0, updated=0, skipped=1"), 4)
+
+        renamed = copy.deepcopy(DD_DATA)
+        renamed["champion"]["Maps/Shipping/Map22/Sets/TFTSet16/Shop/TFT16_KaiSa"]["name"] = "Kai’Sa"
+        out = self.seed(renamed)
+        self.assertIn("Champions: added=0, updated=1, skipped=0", out)
+        self.assertEqual(out.count("added=0, updated=0, skipped=1"), 3)
+        self.assertEqual(Champion.objects.get().name, "Kai’Sa")
+        self.assertEqual(Champion.objects.count(), 1)
+
+    def test_dry_run_writes_nothing(self):
+        self.seed(DD_DATA)
+        before = self.rows()
+
+        changed = copy.deepcopy(DD_DATA)
+        changed["champion"]["Maps/Shipping/Map22/Sets/TFTSet16/Shop/TFT16_KaiSa"]["name"] = "Kai’Sa"
+        changed["trait"]["TFT16_Sniper"] = {"id": "TFT16_Sniper", "name": "Sniper", "image": {"full": "Sniper.TFT_Set16.png"}}
+        out = self.seed(changed, "--dry-run")
+        self.assertIn("Champions: added=0, updated=1, skipped=0", out)
+        self.assertIn("Traits: added=1, updated=0, skipped=1", out)
+        self.assertEqual(self.rows(), before)
+
+    def test_dry_run_on_empty_db(self):
+        out = self.seed(DD_DATA, "--dry-run")
+        self.assertEqual(out.count("added=1, updated=0, skipped=0"), 4)
+        self.assertFalse(Champion.objects.exists())
+
+
+class SeedTftCatalogTests(SimpleTestCase):
+    def test_tutorial_champions_skipped_in_any_case(self):
+        run = SeedRun(img_prefix={"champion": ""}, set_filter=0, all_sets=False, include_tutorial=False)
+        for entry_id in ("TFTTutorial_Garen", "tfttutorial_Garen", "TFTTUTORIAL_Garen"):
+            with self.subTest(entry_id=entry_id):
+                self.assertIsNone(_champion_row("", {"id": entry_id, "name": "Garen", "cost": 1}, run))
+
+        self.assertIsNotNone(_champion_row("", {"id": "TFT16_Garen", "name": "Garen", "cost": 1}, run))
+        run.include_tutorial = True
+        self.assertIsNotNone(_champion_row("", {"id": "tfttutorial_Garen", "name": "Garen", "cost": 1}, run))
+
+
+class EditedPatchHtmlTests(TestCase):
+    """Editing raw_html (admin/shell) marks sections stale until reparse_tft_patches runs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(name="TFT", slug="tft")
+
+    def setUp(self):
+        cache.clear()
+        self.html = parse_tft_patch_page((TESTDATA / "tft_patch_16_4.html").read_bytes(), "utf-8")[0]
+        self.edited = parse_tft_patch_page((TESTDATA / "tft_patch_16_4_refetched.html").read_bytes(), "utf-8")[0]
+        self.patch = Patch.objects.create(game=self.game, version="16.4", raw_html=self.html)
+        call_command("reparse_tft_patches", stdout=StringIO())
+        self.patch.refresh_from_db()
+
+    def page(self):
+        return self.client.get(reverse("patch_detail", args=["tft", "16.4"])).content.decode()
+
+    def test_edit_marks_stale_and_reparse_rebuilds(self):
+        self.assertFalse(self.patch.sections_stale)
+        self.assertIn("Ahri: AD 50 ⇒ 55", self.page())
+        old_hash = bytes(self.patch.content_hash)
+
+        patch = Patch.objects.get(pk=self.patch.pk)
+        patch.raw_html = self.edited
+        patch.save()
+        patch.refresh_from_db()
+        self.assertTrue(patch.sections_stale)
+        self.assertNotEqual(bytes(patch.content_hash), old_hash)
+
+        # stale sections are not served; the page parses the new HTML instead
+        self.assertIn("Ahri: AD 50 ⇒ 60", self.page())
+
+        out = StringIO()
+        call_command("reparse_tft_patches", stdout=out)
+        self.assertIn("16.4: sections added=1, updated=1", out.getvalue())
+        patch.refresh_from_db()
+        self.assertFalse(patch.sections_stale)
+        self.assertTrue(patch.sections.filter(text__contains="Ahri: AD 50 ⇒ 60").exists())
+
+    def test_saves_that_leave_raw_html_alone(self):
+        patch = Patch.objects.defer("raw_html").get(pk=self.patch.pk)
+        patch.etag = '"v2"'
+        patch.save()
+
+        patch = Patch.objects.get(pk=self.patch.pk)
+        patch.released_at = "2026-10-01"
+        patch.save()
+        patch.raw_html = self.edited
+        patch.save(update_fields=["released_at"])
+
+        self.assertFalse(Patch.objects.get(pk=self.patch.pk).sections_stale)
+        out = StringIO()
+        call_command("reparse_tft_patches", stdout=out)
+        self.assertIn("Nothing to reparse.", out.getvalue())
+
+
+class ParseCacheTests(TestCase):
+    """views._parse_tft_patch_cached keys on the content actually parsed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = Game.objects.create(name="TFT", slug="tft")
+
+    def setUp(self):
+        cache.clear()
+        self.patch = Patch.objects.create(
+            game=self.game, version="16.4", raw_html=(TESTDATA / "tft_patch_16_4.html").read_text("utf-8")
+        )
+
+    def test_hit_then_miss_after_edit(self):
+        with mock.patch("main.views.parse_tft_patch", wraps=views.parse_tft_patch) as parse:
+            first = views._parse_tft_patch_cached(self.patch)
+            self.assertEqual(views._parse_tft_patch_cached(Patch.objects.get(pk=self.patch.pk)), first)
+            self.assertEqual(parse.call_count, 1)
+
+            # edited without going through save(), so content_hash is stale too
+            Patch.objects.filter(pk=self.patch.pk).update(
+                raw_html=(TESTDATA / "tft_patch_16_4_refetched.html").read_text("utf-8")
+            )
+            edited = views._parse_tft_patch_cached(Patch.objects.get(pk=self.patch.pk))
+            self.assertEqual(parse.call_count, 2)
+            self.assertIn("Ahri: AD 50 ⇒ 60", edited["champions"]["all"])
+
+            Patch.objects.filter(pk=self.patch.pk).update(raw_text="plain text notes")
+            views._parse_tft_patch_cached(Patch.objects.get(pk=self.patch.pk))
+            self.assertEqual(parse.call_count, 3)
+
+
+PATCH_URL = "https://teamfighttactics.leagueoflegends.com/en-us/news/game-updates/teamfight-tactics-patch-16-4/"
+NOTES_URL = PATCH_URL.rstrip("/") + "-notes/"
+
+
+def patch_page(name: str) -> bytes:
+    # fixture page plus enough body text to pass the command's length checks
+    html = (TESTDATA / name).read_text("utf-8")
+    return html.replace("</div></main>", "<p>" + "filler text " * 40 + "</p></div></main>").encode("utf-8")
+
+
+class FakeSession:
+    """Stands in for requests.Session: answers from `routes`, records every call."""
+
+    def __init__(self, routes):
+        self.routes = routes  # {(method, url): (status, body, headers)}
+        self.headers = {}
+        self.calls = []
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def _respond(self, method, url, headers=None, **kwargs):
+        self.calls.append((method, url, dict(headers or {})))
+        status, body, resp_headers = self.routes.get((method, url), (404, b"", {}))
+        r = requests.Response()
+        r.status_code, r._content, r.url = status, body, url
+        r.headers = requests.structures.CaseInsensitiveDict(resp_headers)
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+        return r
+
+    def head(self, url, **kwargs):
+        return self._respond("HEAD", url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self._respond("GET", url, **kwargs)
+
+
+class FetchTftPatchesTests(TestCase):
+    """fetch_tft_patches against a stubbed requests.Session (no network)."""
+
+    HTML_HEADERS = {"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"', "Last-Modified": "Mon, 12 Oct 2026 10:00:00 GMT"}
+
+    def fetch(self, routes):
+        session = FakeSession(routes)
+        out = StringIO()
+        with mock.patch("main.management.commands.fetch_tft_patches.requests.Session", return_value=session):
+            call_command("fetch_tft_patches", "--versions", "16.4", "--workers", "1", stdout=out, stderr=StringIO())
+        return out.getvalue(), session.calls
+
+    def first_fetch(self):
+        out, _ = self.fetch({
+            ("HEAD", PATCH_URL): (200, b"", {}),
+            ("GET", PATCH_URL): (200, patch_page("tft_patch_16_4.html"), self.HTML_HEADERS),
+        })
+        return out, Patch.objects.get(version="16.4")
+
+    def test_new_page_is_inserted_and_sectioned(self):
+        out, patch = self.first_fetch()
+        self.assertIn("Added=1", out)
+        self.assertEqual((patch.version_major, patch.version_minor), (16, 4))
+        self.assertEqual((patch.source_url, patch.source_slug), (PATCH_URL, "teamfight-tactics-patch-16-4"))
+        self.assertEqual((patch.etag, patch.last_modified), ('"v1"', "Mon, 12 Oct 2026 10:00:00 GMT"))
+        self.assertIn("<h2>LARGE CHANGES</h2>", patch.raw_html)
+        self.assertTrue(patch.sections.filter(text__contains="Ahri: AD 50 ⇒ 55").exists())
+        self.assertEqual(set(patch.sections.values_list("set_key", flat=True)), {16})
+
+    def test_not_modified_is_skipped(self):
+        _, patch = self.first_fetch()
+        out, calls = self.fetch({("GET", PATCH_URL): (304, b"", {})})
+
+        self.assertIn("Skipped 16.4 (not modified)", out)
+        # known URL first, conditionally, without a HEAD pre-check
+        self.assertEqual(calls, [("GET", PATCH_URL, {
+            "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 12 Oct 2026 10:00:00 GMT",
+        })])
+        self.assertEqual(Patch.objects.get().updated_at, patch.updated_at)
+
+    def test_same_body_only_updates_validators(self):
+        _, patch = self.first_fetch()
+        sections = list(patch.sections.values_list("id", "text"))
+
+        out, _ = self.fetch({
+            ("GET", PATCH_URL): (200, patch_page("tft_patch_16_4.html"), {**self.HTML_HEADERS, "ETag": '"v2"'}),
+        })
+        self.assertIn("Skipped 16.4\n", out)
+        refetched = Patch.objects.get()
+        self.assertEqual(refetched.etag, '"v2"')
+        self.assertEqual(bytes(refetched.content_hash), bytes(patch.content_hash))
+        self.assertEqual(list(refetched.sections.values_list("id", "text")), sections)
+
+    def test_changed_body_upserts_and_syncs_sections(self):
+        _, patch = self.first_fetch()
+        out, _ = self.fetch({
+            ("GET", PATCH_URL): (200, patch_page("tft_patch_16_4_refetched.html"), {**self.HTML_HEADERS, "ETag": '"v2"'}),
+        })
+        self.assertIn("Updated 16.4", out)
+        self.assertIn("Sections for 16.4: added=1, updated=1, removed=0", out)
+
+        refetched = Patch.objects.get()
+        self.assertEqual(refetched.pk, patch.pk)
+        self.assertEqual(refetched.etag, '"v2"')
+        self.assertNotEqual(bytes(refetched.content_hash), bytes(patch.content_hash))
+        self.assertEqual((refetched.version_major, refetched.version_minor), (16, 4))
+        self.assertTrue(refetched.sections.filter(text__contains="Ahri: AD 50 ⇒ 60").exists())
+
+    def test_head_precheck(self):
+        # 404 on HEAD: that candidate is never downloaded; 405 falls through to GET
+        out, calls = self.fetch({
+            ("HEAD", PATCH_URL): (404, b"", {}),
+            ("HEAD", NOTES_URL): (405, b"", {}),
+            ("GET", NOTES_URL): (200, patch_page("tft_patch_16_4.html"), self.HTML_HEADERS),
+        })
+        self.assertEqual([(m, u) for m, u, _ in calls], [("HEAD", PATCH_URL), ("HEAD", NOTES_URL), ("GET", NOTES_URL)])
+        self.assertEqual(Patch.objects.get().source_url, NOTES_URL)
+
+    def test_missing_version(self):
+        out, calls = self.fetch({})
+        self.assertIn("NotFound=1", out)
+        self.assertEqual([m for m, _, _ in calls], ["HEAD", "HEAD"])
+        self.assertFalse(Patch.objects.exists())
+
+
+class ParsePatchPageTests(SimpleTestCase):
+    HTML = (
+        '<html><body><main><div id="patch-notes-container">'
+        "<style>.x{color:red}</style><p>Intro <!-- note --> text</p>"
+        '<script>var a = "<b>";</script>tail after script'
+        "<h2>LARGE CHANGES</h2><h4>UNITS: Tier 1</h4><ul><li>Ahri: AD 50 ⇒ 55</li></ul>"
+        "</div></main></body></html>"
+    )
+
+    def test_raw_html_keeps_scripts_and_text_skips_them(self):
+        backends = [("bs4", None)] + ([("lxml", tft_patch_parser.lxml)] if tft_patch_parser.lxml else [])
+        pages = {}
+        for name, module in backends:
+            with self.subTest(backend=name), mock.patch.object(tft_patch_parser, "lxml", module):
+                raw_html, raw_text, blocks = parse_tft_patch_page(self.HTML)
+                self.assertIn('<script>var a = "<b>";</script>', raw_html)
+                self.assertIn("<style>.x{color:red}</style>", raw_html)
+                self.assertEqual(raw_text, "Intro\ntext\ntail after script\nLARGE CHANGES\nUNITS: Tier 1\nAhri: AD 50 ⇒ 55")
+                pages[name] = (raw_text, blocks)
+        self.assertEqual(len(set(map(repr, pages.values()))), 1)
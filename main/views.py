@@ -1,21 +1,23 @@
 
 # Create your views here.
+import hashlib
+from functools import lru_cache
+
+from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import render, redirect, get_object_or_404
-from django.template.loader import select_template
-from .models import Game, Patch, LinkedGameAccount, PatchSuggestion
 from django.contrib.auth.forms import UserCreationForm
-from django.contrib.auth import login
-from main.parsers.tft_patch_parser import parse_tft_patch
+from django.core.cache import cache
+from django.db.models import Q
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import select_template
 
-import re
+from main.parsers.tft_patch_parser import PARSER_VERSION, parse_tft_patch, tft_sections_from_blocks
 
+from .models import Champion, Game, Item, LinkedGameAccount, Patch, PatchSuggestion
 
 
-from django.shortcuts import get_object_or_404, render
-from django.db.models import Q
-
-from .models import Game, Patch, Champion, Item
+# parsed output only changes with the page content or the parser version
+TFT_PARSE_CACHE_TTL = 60 * 60 * 24 * 30
 
 
 def _patch_set_key(patch: Patch) -> int:
@@ -30,8 +32,11 @@ def _patch_set_key(patch: Patch) -> int:
 
 
 def patch_champions(request, game_slug: str, version: str):
-    game = get_object_or_404(Game, slug=game_slug)
-    patch = get_object_or_404(Patch, game=game, version=version)
+    patch = get_object_or_404(
+        Patch.objects.select_related("game").defer("raw_text", "raw_html"),
+        game__slug=game_slug, version=version,
+    )
+    game = patch.game
 
     set_key = _patch_set_key(patch)
 
@@ -50,8 +55,11 @@ def patch_champions(request, game_slug: str, version: str):
 
 
 def patch_items(request, game_slug: str, version: str):
-    game = get_object_or_404(Game, slug=game_slug)
-    patch = get_object_or_404(Patch, game=game, version=version)
+    patch = get_object_or_404(
+        Patch.objects.select_related("game").defer("raw_text", "raw_html"),
+        game__slug=game_slug, version=version,
+    )
+    game = patch.game
 
     set_key = _patch_set_key(patch)
 
@@ -60,9 +68,10 @@ def patch_items(request, game_slug: str, version: str):
         .filter(game=game)
         .filter(Q(set_key=0) | Q(set_key=set_key))  # global + set items
         .order_by("kind", "subgroup", "name")
+        .values("kind", "subgroup", "name", "image_url")  # all the template shows
     )
 
-    # split into buckets for the template
+    # split into buckets for the template; fixed order, empty ones included
     buckets = {
         "core": [],
         "radiant": [],
@@ -70,7 +79,7 @@ def patch_items(request, game_slug: str, version: str):
         "set": [],
     }
     for it in items:
-        buckets.get(it.kind, buckets["core"]).append(it)
+        buckets.get(it["kind"], buckets["core"]).append(it)
 
     return render(request, "games/tft/patch_items.html", {
         "game": game,
@@ -101,39 +110,70 @@ def game_list(request):
     return render(request, "main/game_list.html", {"games": games})
 
 
-def game_detail(request, slug):
-    game = get_object_or_404(Game, slug=slug)
-
-    patches = list(Patch.objects.filter(game=game))
+@lru_cache(maxsize=64)
+def _game_detail_template(slug: str) -> str:
+    # which template a game uses only changes with a deploy; resolve it once
+    return select_template([
+        f"games/{slug}/game_detail.html",
+        "main/game_detail.html",
+    ]).template.name
 
-    def vkey(p):
-        m = re.match(r"^(\d+)\.(\d+)$", (p.version or "").strip())
-        if not m:
-            return (-1, -1)  # okända versioner hamnar längst ner
-        return (int(m.group(1)), int(m.group(2)))
 
-    patches.sort(key=vkey, reverse=True)
+def game_detail(request, slug):
+    game = get_object_or_404(Game, slug=slug)
 
-    template = select_template([
-        f"games/{game.slug}/game_detail.html",
-        "main/game_detail.html",
-    ])
+    # the list never shows the page text, so don't pull (and decompress) it
+    # newest first; unknown version formats (0/0) end up at the bottom
+    patches = (
+        Patch.objects.filter(game=game)
+        .defer("raw_text", "raw_html")
+        .order_by("-version_major", "-version_minor", "-updated_at", "-created_at")
+    )
 
-    return render(request, template.template.name, {
+    return render(request, _game_detail_template(game.slug), {
         "game": game,
         "patches": patches,   # <-- viktig
     })
 
+def _parse_tft_patch_cached(patch: Patch):
+    """
+    parse_tft_patch() for a patch, cached by a hash of the HTML/text being
+    parsed (and the parser version), so the same page is only ever parsed
+    once and an edited page never gets the old result.
+    """
+    raw_html = patch.raw_html or ""
+    raw_text = patch.raw_text or ""
+
+    def parse():
+        return parse_tft_patch(raw_text=raw_text, raw_html=raw_html or None)
+
+    digest = hashlib.sha256(raw_html.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(raw_text.encode("utf-8"))
+    key = f"tft:parse:v{PARSER_VERSION}:{digest.hexdigest()}"
+    return cache.get_or_set(key, parse, TFT_PARSE_CACHE_TTL)
+
+
 def patch_detail(request, slug, version):
-    game = get_object_or_404(Game, slug=slug)
-    patch = get_object_or_404(Patch, game=game, version=version)
+    # raw_html is only needed when the patch has no stored sections; the page
+    # doesn't list entity changes, and only TFT pages use sections at all
+    patches = Patch.objects.select_related("game").defer("raw_html")
+    if slug == "tft":
+        patches = patches.for_detail(changes=False)
+    patch = get_object_or_404(patches, game__slug=slug, version=version)
+    game = patch.game
 
     sections = None
     if game.slug == "tft":
-        sections = parse_tft_patch(
-            raw_text=patch.raw_text or "",
-            raw_html=patch.raw_html or None,
-        )
+        # sections of an edited page are out of date until reparse_tft_patches runs
+        stored = [] if patch.sections_stale else [
+            {"category": s.category, "size": s.size, "h2": s.h2, "h4": s.h4, "text": s.text}
+            for s in patch.sections.all()
+        ]
+        if stored:
+            sections = tft_sections_from_blocks(stored)
+        else:
+            sections = _parse_tft_patch_cached(patch)
 
     return render(request, "games/tft/patch_detail.html", {
         "game": game,